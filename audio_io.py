@@ -0,0 +1,33 @@
+"""
+16-bit PCM helpers shared by the voice demos: sample conversion and a WAV writer
+that needs no libsndfile.
+"""
+
+import os
+import struct
+
+import numpy as np
+
+
+def to_pcm16(audio: np.ndarray) -> np.ndarray:
+    """float32 [-1,1] (or int16) mono -> contiguous int16 samples."""
+    if audio.dtype != np.int16:
+        audio = np.rint(np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+    return np.ascontiguousarray(audio)
+
+
+def write_wav(fd: int, audio: np.ndarray, sr: int):
+    """
+    Write mono audio to an open file descriptor as a 16-bit PCM WAV (the format
+    soundfile wrote) and close it: a 44-byte header plus the raw samples.
+    """
+    audio = to_pcm16(audio)
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + audio.nbytes, b"WAVE",
+        b"fmt ", 16, 1, 1, sr, sr * 2, 2, 16,  # PCM, mono, 16-bit
+        b"data", audio.nbytes,
+    )
+    with os.fdopen(fd, "wb") as f:
+        f.write(header)
+        f.write(audio)
@@ -1,9 +1,41 @@
-import sys, os
-sys.path.insert(0, "cactus/python/src")
-os.environ["CACTUS_NO_CLOUD_TELE"] = "1"
+import sys, os, time
+import argparse, csv, io, json, hashlib, shelve, threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from types import MappingProxyType
+import numpy as np
 
-import json
-from main import generate_hybrid
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the matching kernel then runs as plain Python
+    def njit(*args, **kwargs):
+        return lambda fn: fn
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # orjson is optional; stdlib json parses the same files
+    _json_loads = json.loads
+
+CACTUS_PYTHON_SRC = "cactus/python/src"
+
+# Exact-match request cache, opt-in so fresh latency measurements are the default.
+BENCH_CACHE = os.environ.get("BENCH_CACHE") == "1"
+BENCH_CACHE_PATH = os.environ.get("BENCH_CACHE_PATH", "bench_cache.db")
+
+# Untimed on-device call before the first case; BENCH_WARMUP=0 skips it.
+BENCH_WARMUP = os.environ.get("BENCH_WARMUP", "1") == "1"
+
+# Number of cases run concurrently; 1 keeps the original serial loop.
+BENCH_WORKERS = int(os.environ.get("BENCH_WORKERS", "1"))
+
+# Append-only per-case results log. Cases already in it are not re-run.
+BENCH_RESULTS_CSV = os.environ.get("BENCH_RESULTS_CSV")
+CSV_FIELDS = ("name", "difficulty", "f1", "total_time_ms", "source")
+
+ON_DEVICE = "on-device"  # generate_hybrid's "source" for answers that never reached the cloud
+
+# Leftover calls per side above which subset matching runs in the compiled kernel.
+JIT_MATCH_THRESHOLD = 16
 
 
 ############## Tool definitions (NEW) ##############
@@ -108,6 +140,20 @@ TOOL_TRANSLATE_TEXT = {
 }
 
 
+TOOLS_BY_NAME = {
+    t["name"]: t
+    for t in (TOOL_GET_FORECAST, TOOL_CONVERT_CURRENCY, TOOL_BOOK_RIDE, TOOL_CREATE_CAL_EVENT,
+              TOOL_ADD_TO_SHOPPING_LIST, TOOL_SET_FOCUS_MODE, TOOL_TRANSLATE_TEXT)
+}
+
+# Each shared TOOL_* dict is serialized once; cases reference them by identity.
+TOOL_JSON = {
+    id(t): (t, json.dumps(t, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    for t in (TOOL_GET_FORECAST, TOOL_CONVERT_CURRENCY, TOOL_BOOK_RIDE, TOOL_CREATE_CAL_EVENT,
+              TOOL_ADD_TO_SHOPPING_LIST, TOOL_SET_FOCUS_MODE, TOOL_TRANSLATE_TEXT)
+}
+
+
 ############## Benchmark cases (NEW) ##############
 
 BENCHMARKS = [
@@ -400,22 +446,76 @@ def _normalize(v):
     return v
 
 
+def _freeze(v):
+    """Make a normalized value hashable (lists -> tuples, dicts -> frozensets)."""
+    if isinstance(v, list):
+        return tuple(_freeze(x) for x in v)
+    if isinstance(v, dict):
+        return frozenset((k, _freeze(x)) for k, x in v.items())
+    return v
+
+
+def _canon_call(call):
+    """Hashable (name, frozenset of normalized (arg, value) pairs) form of a call."""
+    args = call.get("arguments", {})
+    # Plain strings are by far the common case; normalize them inline.
+    return call["name"], frozenset(
+        (k, v.strip().lower() if type(v) is str else _freeze(_normalize(v))) for k, v in args.items()
+    )
+
+
 def _call_matches(predicted, expected):
-    """Check if a predicted call matches an expected call (name + argument values)."""
-    if predicted["name"] != expected["name"]:
-        return False
-    pred_args = predicted.get("arguments", {})
-    exp_args = expected.get("arguments", {})
-    for key, exp_val in exp_args.items():
-        if key not in pred_args:
-            return False
-        if _normalize(pred_args[key]) != _normalize(exp_val):
-            return False
-    return True
-
-
-def compute_f1(pred_calls, exp_calls):
-    """Compute F1 on tool calls (treat each expected call as a target)."""
+    """Check if a canonical predicted call matches a canonical expected call (name + argument values)."""
+    return predicted[0] == expected[0] and expected[1] <= predicted[1]
+
+
+def _pack_calls(calls, ids):
+    """
+    Encode canonical calls as interned int arrays: one name id per call plus a
+    CSR layout (offsets, sorted pair ids) of each call's (arg, value) pairs.
+    """
+    names = np.empty(len(calls), dtype=np.int64)
+    offsets = np.zeros(len(calls) + 1, dtype=np.int64)
+    pairs = []
+    for i, (name, args) in enumerate(calls):
+        names[i] = ids.setdefault(name, len(ids))
+        pairs.extend(sorted(ids.setdefault(pair, len(ids)) for pair in args))
+        offsets[i + 1] = len(pairs)
+    return names, offsets, np.array(pairs, dtype=np.int64)
+
+
+@njit(cache=True)
+def _match_packed(pred_names, pred_off, pred_pairs, exp_names, exp_off, exp_pairs):
+    """Greedy subset matching over packed calls; returns the number of matched expected calls."""
+    used = np.zeros(pred_names.shape[0], dtype=np.bool_)
+    matched = 0
+    for j in range(exp_names.shape[0]):
+        for i in range(pred_names.shape[0]):
+            if used[i] or pred_names[i] != exp_names[j]:
+                continue
+            # A prediction with fewer arguments cannot contain the expected ones.
+            if exp_off[j + 1] - exp_off[j] > pred_off[i + 1] - pred_off[i]:
+                continue
+            # Both pair lists are sorted, so exp <= pred is a single merge walk.
+            a, b = pred_off[i], exp_off[j]
+            while a < pred_off[i + 1] and b < exp_off[j + 1]:
+                if pred_pairs[a] == exp_pairs[b]:
+                    b += 1
+                elif pred_pairs[a] > exp_pairs[b]:
+                    break
+                a += 1
+            if b == exp_off[j + 1]:
+                used[i] = True
+                matched += 1
+                break
+    return matched
+
+
+def compute_f1(pred_calls, exp_calls, exp_norm=None):
+    """
+    Compute F1 on tool calls (treat each expected call as a target).
+    `exp_norm` is the precomputed canonical form of `exp_calls`, if available.
+    """
     if not exp_calls and not pred_calls:
         return 1.0
     if not exp_calls and pred_calls:
@@ -423,19 +523,29 @@ def compute_f1(pred_calls, exp_calls):
     if exp_calls and not pred_calls:
         return 0.0
 
-    matched_exp = set()
-    matched_pred = set()
-
-    for i, p in enumerate(pred_calls):
-        for j, e in enumerate(exp_calls):
-            if j in matched_exp:
-                continue
-            if _call_matches(p, e):
-                matched_exp.add(j)
-                matched_pred.add(i)
-                break
+    if exp_norm is None:
+        exp_norm = [_canon_call(e) for e in exp_calls]
+
+    # Exact matches are a multiset intersection; only calls left over (e.g. a
+    # prediction carrying extra arguments) fall back to subset matching.
+    pred_counts = Counter(map(_canon_call, pred_calls))
+    exp_counts = Counter(exp_norm)
+    common = pred_counts & exp_counts
+    tp = sum(common.values())
+
+    leftover_pred = list((pred_counts - common).elements())
+    leftover_exp = list((exp_counts - common).elements())
+    if min(len(leftover_pred), len(leftover_exp)) > JIT_MATCH_THRESHOLD:
+        ids = {}
+        tp += _match_packed(*_pack_calls(leftover_pred, ids), *_pack_calls(leftover_exp, ids))
+    else:
+        for e in leftover_exp:
+            for i, p in enumerate(leftover_pred):
+                if _call_matches(p, e):
+                    tp += 1
+                    del leftover_pred[i]
+                    break
 
-    tp = len(matched_pred)
     fp = len(pred_calls) - tp
     fn = len(exp_calls) - tp
 
@@ -446,35 +556,218 @@ def compute_f1(pred_calls, exp_calls):
     return 2 * (precision * recall) / (precision + recall)
 
 
-def run_benchmark():
-    results = []
-    print(f"Running {len(BENCHMARKS)} benchmark cases...\n")
-
-    for idx, case in enumerate(BENCHMARKS, start=1):
-        name = case["name"]
-        difficulty = case["difficulty"]
-        messages = case["messages"]
-        tools = case["tools"]
-        expected_calls = case["expected_calls"]
-
-        result = generate_hybrid(messages, tools)
-
-        pred_calls = result.get("function_calls", [])
-        f1 = compute_f1(pred_calls, expected_calls)
-
-        total_time_ms = result.get("total_time_ms", 0.0)
-        source = "cloud (fallback)" if result.get("cloud_handoff") else "on-device"
-
-        print(f"[{idx}/{len(BENCHMARKS)}] Running: {name} ({difficulty})... "
-              f"F1={f1:.2f} | {total_time_ms:.0f}ms | {source}")
-
-        results.append({
-            "name": name,
-            "difficulty": difficulty,
-            "f1": f1,
-            "total_time_ms": total_time_ms,
-            "source": source,
-        })
+_memory_cache = {}
+_cache_lock = threading.Lock()  # shelve is not safe across worker threads
+
+
+_tool_set_json = {}
+
+
+def _tool_json(tool):
+    """Canonical JSON bytes for a tool schema; the shared TOOL_* dicts are served from TOOL_JSON."""
+    cached = TOOL_JSON.get(id(tool))
+    if cached is not None and cached[0] is tool:
+        return cached[1]
+    return json.dumps(tool, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def _tools_json(tools):
+    """JSON array bytes for a tool list, built once per distinct list of shared TOOL_* dicts."""
+    sig = tuple(id(t) for t in tools)
+    blob = _tool_set_json.get(sig)
+    if blob is None:
+        blob = b"[" + b",".join(_tool_json(t) for t in tools) + b"]"
+        if all(TOOL_JSON.get(i, (None,))[0] is t for i, t in zip(sig, tools)):
+            _tool_set_json[sig] = blob
+    return blob
+
+
+def _cache_key(messages, tools):
+    """Stable hash of a (messages, tools) request; same digest as hashing json.dumps([messages, tools])."""
+    messages_json = json.dumps(messages, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    payload = b"[" + messages_json + b"," + _tools_json(tools) + b"]"
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _boot():
+    """
+    Make the local cactus build importable and silence its telemetry. Deferred until
+    a case actually runs, so importing this module (to inspect BENCHMARKS or score
+    saved results) neither loads the model stack nor mutates global state.
+    """
+    if CACTUS_PYTHON_SRC not in sys.path:
+        sys.path.insert(0, CACTUS_PYTHON_SRC)
+    os.environ["CACTUS_NO_CLOUD_TELE"] = "1"
+
+
+def warmup():
+    """
+    Pay one-time costs (imports, library load, weight paging) before any case is
+    timed. Runs on-device only, so the trivial prompt can never fall back to cloud.
+    """
+    _boot()
+    from main import generate_cactus
+
+    generate_cactus([{"role": "user", "content": "ping"}], [TOOL_GET_FORECAST])
+
+
+def cached_generate(messages, tools, key=None):
+    """
+    Call generate_hybrid, reusing stored results for identical requests when BENCH_CACHE=1.
+    `key` is the precomputed _cache_key of the request, if available.
+    """
+    _boot()
+    from main import generate_hybrid
+
+    if not BENCH_CACHE:
+        return generate_hybrid(messages, tools)
+    if key is None:
+        key = _cache_key(messages, tools)
+    with _cache_lock:
+        if key in _memory_cache:
+            return _memory_cache[key]
+        with shelve.open(BENCH_CACHE_PATH) as shelf:
+            if key in shelf:
+                result = _memory_cache[key] = shelf[key]
+                return result
+
+    result = generate_hybrid(messages, tools)
+    with _cache_lock, shelve.open(BENCH_CACHE_PATH) as shelf:
+        _memory_cache[key] = shelf[key] = result
+    return result
+
+
+def _freeze_case(case):
+    """
+    Read-only view of a benchmark case carrying its canonical expected calls
+    and request-cache key, both computed once here.
+    """
+    return MappingProxyType({
+        **case,
+        "_expected_norm": tuple(_canon_call(e) for e in case["expected_calls"]),
+        "_cache_key": _cache_key(case["messages"], case["tools"]),
+    })
+
+
+# Per-case derived inputs are built once at import, not on every run.
+BENCHMARKS = tuple(_freeze_case(case) for case in BENCHMARKS)
+
+
+def load_cases(path):
+    """
+    Stream benchmark cases from a JSONL file, one case per line, in the same shape
+    as BENCHMARKS except that "tools" lists tool names (resolved via TOOLS_BY_NAME).
+    """
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            case = _json_loads(line)
+            case["tools"] = [TOOLS_BY_NAME[name] for name in case["tools"]]
+            yield _freeze_case(case)
+
+
+def _run_case(case):
+    """Run a single benchmark case and return its result row."""
+    t0 = time.perf_counter_ns()
+    result = cached_generate(case["messages"], case["tools"], case["_cache_key"])
+    t1 = time.perf_counter_ns()
+
+    pred_calls = result.get("function_calls", [])
+    f1 = compute_f1(pred_calls, case["expected_calls"], case["_expected_norm"])
+
+    total_time_ms = result.get("total_time_ms", (t1 - t0) / 1e6)
+    # generate_hybrid reports routing in "source"; older callers set cloud_handoff.
+    source = result.get("source", "cloud (fallback)" if result.get("cloud_handoff") else ON_DEVICE)
+
+    return {
+        "name": case["name"],
+        "difficulty": case["difficulty"],
+        "f1": f1,
+        "total_time_ms": total_time_ms,
+        "cloud": source != ON_DEVICE,
+        "source": source,
+    }
+
+
+def _format_row(idx, total, r):
+    return (f"[{idx}/{total}] Running: {r['name']} ({r['difficulty']})... "
+            f"F1={r['f1']:.2f} | {r['total_time_ms']:.0f}ms | {r['source']}")
+
+
+def _csv_row(values):
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator="\n").writerow(values)
+    return buf.getvalue().encode("utf-8")
+
+
+def _load_csv_results(path):
+    """Result rows already recorded in a results CSV, keyed by case name."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, newline="", encoding="utf-8") as f:
+        return {
+            row["name"]: {
+                **row,
+                "f1": float(row["f1"]),
+                "total_time_ms": float(row["total_time_ms"]),
+                "cloud": row.get("source", ON_DEVICE) != ON_DEVICE,
+            }
+            for row in csv.DictReader(f)
+        }
+
+
+def run_benchmark(benchmarks=None, verbose=False):
+    """
+    Run all cases (BENCHMARKS by default) and print their rows and the total score.
+    Rows are written in one go after the last case unless `verbose`, which prints
+    each as it finishes. With BENCH_RESULTS_CSV set, each finished case is appended
+    to that file and cases already recorded there are reused instead of re-run.
+    """
+    benchmarks = BENCHMARKS if benchmarks is None else tuple(benchmarks)
+    total = len(benchmarks)
+
+    fd = None
+    recorded = {}
+    if BENCH_RESULTS_CSV:
+        recorded = _load_csv_results(BENCH_RESULTS_CSV)
+        # O_APPEND makes each single os.write of a short row atomic, so a crash
+        # loses at most the case in flight.
+        fd = os.open(BENCH_RESULTS_CSV, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        if os.fstat(fd).st_size == 0:
+            os.write(fd, _csv_row(CSV_FIELDS))
+
+    results = [recorded.get(case["name"]) for case in benchmarks]
+    pending = [i for i, r in enumerate(results) if r is None]
+
+    if BENCH_WARMUP and pending:
+        warmup()
+    print(f"Running {total} benchmark cases...\n", flush=verbose)
+
+    def _done(i, r):
+        results[i] = r
+        if fd is not None:
+            os.write(fd, _csv_row([r[field] for field in CSV_FIELDS]))
+        if verbose:
+            print(_format_row(i + 1, total, r), flush=True)
+
+    try:
+        if BENCH_WORKERS > 1:
+            # Cases are independent and inference releases the GIL, so threads
+            # overlap them; rows land in case order regardless of finish order.
+            with ThreadPoolExecutor(max_workers=BENCH_WORKERS) as pool:
+                futures = {pool.submit(_run_case, benchmarks[i]): i for i in pending}
+                for future in as_completed(futures):
+                    _done(futures[future], future.result())
+        else:
+            for i in pending:
+                _done(i, _run_case(benchmarks[i]))
+    finally:
+        if fd is not None:
+            os.close(fd)
+
+    if not verbose:
+        sys.stdout.write("\n".join(_format_row(idx, total, r) for idx, r in enumerate(results, start=1)) + "\n")
 
     total_score = compute_total_score(results)
     print("\n==============================")
@@ -488,23 +781,33 @@ def compute_total_score(results):
     difficulty_weights = {"easy": 0.20, "medium": 0.30, "hard": 0.50}
     time_baseline_ms = 500  # anything under this gets full marks
 
-    total_score = 0
-    for difficulty, weight in difficulty_weights.items():
-        group = [r for r in results if r["difficulty"] == difficulty]
-        if not group:
+    # One column per field; each bucket is then three masked reductions.
+    difficulty = np.array([r["difficulty"] for r in results], dtype=str)
+    f1 = np.array([r["f1"] for r in results], dtype=np.float64)
+    time_ms = np.array([r["total_time_ms"] for r in results], dtype=np.float64)
+    cloud = np.array([r.get("cloud", r.get("source", ON_DEVICE) != ON_DEVICE) for r in results], dtype=np.float64)
+
+    total_score = 0.0
+    for level, weight in difficulty_weights.items():
+        mask = difficulty == level
+        if not mask.any():
             continue
 
-        avg_f1 = sum(r["f1"] for r in group) / len(group)
-        avg_time = sum(r["total_time_ms"] for r in group) / len(group)
-        on_device_ratio = sum(1 for r in group if r["source"] == "on-device") / len(group)
+        avg_f1 = f1[mask].mean()
+        avg_time = time_ms[mask].mean()
+        on_device_ratio = 1.0 - cloud[mask].mean()
 
-        time_score = max(0, 1 - avg_time / time_baseline_ms)
+        time_score = max(0.0, 1 - avg_time / time_baseline_ms)
 
         level_score = (0.60 * avg_f1) + (0.15 * time_score) + (0.25 * on_device_ratio)
         total_score += weight * level_score
 
-    return total_score * 100
+    return float(total_score * 100)
 
 
 if __name__ == "__main__":
-    run_benchmark()
+    parser = argparse.ArgumentParser(description="Run the New_Tools benchmark")
+    parser.add_argument("--cases", help="JSONL file of cases to run instead of the built-in suite")
+    parser.add_argument("--verbose", action="store_true", help="print each case as it finishes")
+    args = parser.parse_args()
+    run_benchmark(load_cases(args.cases) if args.cases else None, verbose=args.verbose)
@@ -2,7 +2,37 @@ import sys, os
 sys.path.insert(0, "cactus/python/src")
 os.environ["CACTUS_NO_CLOUD_TELE"] = "1"
 
-from main import generate_hybrid
+import json, hashlib, shelve
+from collections import Counter
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the matching kernel then runs as plain Python
+    def njit(*args, **kwargs):
+        return lambda fn: fn
+
+from main import generate_cactus, generate_hybrid, generate_hybrid_batch, prewarm_models
+
+# Exact-match request cache, opt-in so fresh latency measurements are the default.
+BENCH_CACHE = os.environ.get("BENCH_CACHE") == "1"
+BENCH_CACHE_PATH = os.environ.get("BENCH_CACHE_PATH", "bench_cache.db")
+# Results calling these tools are never stored: replaying a booking or an outgoing
+# message is the case worth re-running. Comma-separated; empty caches everything.
+BENCH_CACHE_SKIP = frozenset(filter(None, os.environ.get("BENCH_CACHE_SKIP", "book_ride,send_message").split(",")))
+
+# Calls per side above which matching runs in the compiled kernel.
+JIT_MATCH_THRESHOLD = 16
+
+# Untimed on-device call before the first case; BENCH_WARMUP=0 skips it.
+BENCH_WARMUP = os.environ.get("BENCH_WARMUP", "1") == "1"
+
+# Cases handed to generate_hybrid_batch at once; 1 keeps the original serial loop.
+BENCH_WORKERS = int(os.environ.get("BENCH_WORKERS", "1"))
+
+# BENCH_LEAN=1 sends schemas without parameter descriptions: a shorter prompt prefix
+# for latency runs. Scores are not comparable with full-schema runs.
+BENCH_LEAN = os.environ.get("BENCH_LEAN") == "1"
 
 
 ############## Old Tool definitions ##############
@@ -197,6 +227,40 @@ TOOL_TRANSLATE_TEXT = {
 }
 
 
+ALL_TOOLS = (
+    TOOL_GET_WEATHER, TOOL_SET_ALARM, TOOL_SEND_MESSAGE, TOOL_CREATE_REMINDER,
+    TOOL_SEARCH_CONTACTS, TOOL_PLAY_MUSIC, TOOL_SET_TIMER,
+    TOOL_GET_FORECAST, TOOL_CONVERT_CURRENCY, TOOL_BOOK_RIDE, TOOL_CREATE_CAL_EVENT,
+    TOOL_ADD_TO_SHOPPING_LIST, TOOL_SET_FOCUS_MODE, TOOL_TRANSLATE_TEXT,
+)
+
+def _lean(tool):
+    """
+    Copy of a tool schema with the parameter descriptions dropped. The tool's own
+    description stays: the cloud fallback declares every tool with it.
+    """
+    params = tool["parameters"]
+    props = {k: {f: x for f, x in spec.items() if f != "description"} for k, spec in params["properties"].items()}
+    return {**tool, "parameters": {**params, "properties": props}}
+
+
+LEAN_TOOLS = {id(t): _lean(t) for t in ALL_TOOLS}
+
+# Canonical JSON bytes of each tool, serialized once and looked up by identity.
+TOOL_JSON = {
+    id(t): (t, json.dumps(t, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    for t in ALL_TOOLS + tuple(LEAN_TOOLS.values())
+}
+
+
+def _tool_json(tool):
+    """Canonical JSON bytes for a tool schema; the shared TOOL_* dicts are served from TOOL_JSON."""
+    cached = TOOL_JSON.get(id(tool))
+    if cached is not None and cached[0] is tool:
+        return cached[1]
+    return json.dumps(tool, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
 ############## Benchmark cases — Old Tools (30 cases) ##############
 
 BENCHMARKS_OLD = [
@@ -742,8 +806,49 @@ BENCHMARKS_NEW = [
 BENCHMARKS = BENCHMARKS_OLD + BENCHMARKS_NEW
 
 
+# One canonical tuple per distinct tool prefix, keyed by the ordered tuple of tool
+# ids (order is kept: it is part of the prompt). Cases sharing a prefix pass the
+# same immutable tuple, so everything keyed on the tool set downstream is computed
+# once and no run can mutate a list other cases reuse.
+TOOL_SETS = {}
+
+
+def _prefix_key(tools):
+    return tuple(id(t) for t in tools)
+
+
+def _shared_tools(tools):
+    if BENCH_LEAN:
+        return TOOL_SETS.setdefault(_prefix_key(tools), tuple(LEAN_TOOLS.get(id(t), t) for t in tools))
+    return TOOL_SETS.setdefault(_prefix_key(tools), tuple(tools))
+
+
+def _columns(cases):
+    """
+    Struct-of-arrays view of benchmark cases: one list per field, difficulty as a
+    NumPy string array for masked filtering (and as int8 codes into DIFFICULTIES
+    for bincount aggregation), and each case's ordered tool names, so the run loop
+    never reads the schema dicts.
+    """
+    return {
+        "name": [c["name"] for c in cases],
+        "difficulty": np.array([c["difficulty"] for c in cases], dtype=str),
+        "difficulty_idx": np.array([DIFFICULTY_INDEX[c["difficulty"]] for c in cases], dtype=np.int8),
+        "messages": [c["messages"] for c in cases],
+        "tools": [_shared_tools(c["tools"]) for c in cases],
+        "prefix_key": [_prefix_key(c["tools"]) for c in cases],
+        "tool_names": [tuple(t["name"] for t in c["tools"]) for c in cases],
+        "expected_calls": [c["expected_calls"] for c in cases],
+        "expected_norm": [_normalize_expected(c["expected_calls"]) for c in cases],
+    }
+
+
 ############## Scoring helpers ##############
 
+DIFFICULTIES = ("easy", "medium", "hard")
+DIFFICULTY_INDEX = {d: i for i, d in enumerate(DIFFICULTIES)}
+
+
 def _normalize(v):
     """Normalize a value for comparison."""
     if isinstance(v, str):
@@ -751,42 +856,122 @@ def _normalize(v):
     return v
 
 
-def _call_matches(predicted, expected):
-    """Check if a predicted call matches an expected call (name + argument values)."""
-    if predicted["name"] != expected["name"]:
-        return False
-    pred_args = predicted.get("arguments", {})
-    exp_args = expected.get("arguments", {})
-    for key, exp_val in exp_args.items():
-        if key not in pred_args:
-            return False
-        if _normalize(pred_args[key]) != _normalize(exp_val):
-            return False
-    return True
+def _normalize_expected(calls):
+    """(name, ((arg, normalized value), ...)) per expected call, built once per suite."""
+    return tuple(
+        (call["name"], tuple((k, _normalize(v)) for k, v in call.get("arguments", {}).items()))
+        for call in calls
+    )
+
+
+def _freeze(v):
+    """Make a normalized value hashable (lists -> tuples, dicts -> frozensets)."""
+    if isinstance(v, list):
+        return tuple(_freeze(x) for x in v)
+    if isinstance(v, dict):
+        return frozenset((k, _freeze(x)) for k, x in v.items())
+    return v
 
 
-def compute_f1(predicted_calls, expected_calls):
-    """Compute F1 score between predicted and expected function calls."""
+def _pack_calls(calls, ids):
+    """
+    Encode calls as interned int arrays: one name id per call plus a CSR layout
+    (offsets, sorted ids of normalized (arg, value) pairs) of each call's arguments.
+    """
+    names = np.empty(len(calls), dtype=np.int64)
+    offsets = np.zeros(len(calls) + 1, dtype=np.int64)
+    pairs = []
+    for i, call in enumerate(calls):
+        names[i] = ids.setdefault(call["name"], len(ids))
+        args = call.get("arguments", {})
+        pairs.extend(sorted(ids.setdefault((k, _freeze(_normalize(v))), len(ids)) for k, v in args.items()))
+        offsets[i + 1] = len(pairs)
+    return names, offsets, np.array(pairs, dtype=np.int64)
+
+
+@njit(cache=True)
+def _match_packed(pred_names, pred_off, pred_pairs, exp_names, exp_off, exp_pairs):
+    """
+    Same greedy matching as compute_f1's loop (each prediction takes the first
+    unmatched expected call it satisfies) over packed calls; returns the match count.
+    """
+    used = np.zeros(exp_names.shape[0], dtype=np.bool_)
+    matched = 0
+    for i in range(pred_names.shape[0]):
+        for j in range(exp_names.shape[0]):
+            if used[j] or pred_names[i] != exp_names[j]:
+                continue
+            if exp_off[j + 1] - exp_off[j] > pred_off[i + 1] - pred_off[i]:
+                continue
+            # Both pair lists are sorted, so exp <= pred is a single merge walk.
+            a, b = pred_off[i], exp_off[j]
+            while a < pred_off[i + 1] and b < exp_off[j + 1]:
+                if pred_pairs[a] == exp_pairs[b]:
+                    b += 1
+                elif pred_pairs[a] > exp_pairs[b]:
+                    break
+                a += 1
+            if b == exp_off[j + 1]:
+                used[j] = True
+                matched += 1
+                break
+    return matched
+
+
+def compute_f1(predicted_calls, expected_calls, exp_norm=None):
+    """
+    Compute F1 score between predicted and expected function calls.
+    exp_norm, when given, is _normalize_expected(expected_calls) computed ahead of time.
+    """
     if not predicted_calls and not expected_calls:
         return 1.0
     if not predicted_calls or not expected_calls:
         return 0.0
 
-    matched_exp = set()
-    matched_pred = set()
+    if min(len(predicted_calls), len(expected_calls)) > JIT_MATCH_THRESHOLD:
+        ids = {}
+        tp = _match_packed(*_pack_calls(predicted_calls, ids), *_pack_calls(expected_calls, ids))
+        return _f1(tp, len(predicted_calls), len(expected_calls))
+
+    if exp_norm is None:
+        exp_norm = _normalize_expected(expected_calls)
+    if len(exp_norm) == 1:
+        # One expected call needs no matched-set bookkeeping: the first prediction
+        # carrying it is the only possible true positive.
+        (exp_name, exp_args), = exp_norm
+        for pred in predicted_calls:
+            if pred["name"] != exp_name:
+                continue
+            pred_args = pred.get("arguments", {})
+            for key, exp_val in exp_args:
+                if key not in pred_args or _normalize(pred_args[key]) != exp_val:
+                    break
+            else:
+                return _f1(1, len(predicted_calls), 1)
+        return _f1(0, len(predicted_calls), 1)
 
-    for i, pred in enumerate(predicted_calls):
-        for j, exp in enumerate(expected_calls):
-            if j in matched_exp:
+    # Each prediction takes the first unmatched expected call of the same name
+    # whose arguments it all carries; only the predicted side is normalized here.
+    matched_exp = set()
+    for pred in predicted_calls:
+        name = pred["name"]
+        pred_args = pred.get("arguments", {})
+        for j, (exp_name, exp_args) in enumerate(exp_norm):
+            if j in matched_exp or exp_name != name:
                 continue
-            if _call_matches(pred, exp):
+            for key, exp_val in exp_args:
+                if key not in pred_args or _normalize(pred_args[key]) != exp_val:
+                    break
+            else:
                 matched_exp.add(j)
-                matched_pred.add(i)
                 break
 
-    tp = len(matched_pred)
-    fp = len(predicted_calls) - tp
-    fn = len(expected_calls) - tp
+    return _f1(len(matched_exp), len(predicted_calls), len(expected_calls))
+
+
+def _f1(tp, n_pred, n_exp):
+    fp = n_pred - tp
+    fn = n_exp - tp
 
     precision = tp / (tp + fp) if (tp + fp) else 0.0
     recall = tp / (tp + fn) if (tp + fn) else 0.0
@@ -795,7 +980,7 @@ def compute_f1(predicted_calls, expected_calls):
     return 2 * (precision * recall) / (precision + recall)
 
 
-def compute_total_score(results):
+def compute_total_score(results, sums=None):
     """
     Compute a total score from 0-100% as a weighted sum across difficulty levels.
 
@@ -808,87 +993,248 @@ def compute_total_score(results):
       - easy: 20%
       - medium: 30%
       - hard: 50%
+
+    `sums` is _aggregate(results) when the caller has already computed it.
     """
-    difficulty_weights = {"easy": 0.20, "medium": 0.30, "hard": 0.50}
+    difficulty_weights = (0.20, 0.30, 0.50)  # indexed like DIFFICULTIES
     time_baseline_ms = 500  # anything under this gets full marks
 
+    counts, f1_sums, time_sums, on_device = _aggregate(results) if sums is None else sums
     total_score = 0
-    for difficulty, weight in difficulty_weights.items():
-        group = [r for r in results if r["difficulty"] == difficulty]
-        if not group:
+    for i, weight in enumerate(difficulty_weights):
+        n = int(counts[i])
+        if not n:
             continue
 
-        avg_f1 = sum(r["f1"] for r in group) / len(group)
-        avg_time = sum(r["total_time_ms"] for r in group) / len(group)
-        on_device_ratio = sum(1 for r in group if r["source"] == "on-device") / len(group)
+        avg_f1 = f1_sums[i] / n
+        avg_time = time_sums[i] / n
+        on_device_ratio = on_device[i] / n
 
         time_score = max(0, 1 - avg_time / time_baseline_ms)
 
         level_score = (0.60 * avg_f1) + (0.15 * time_score) + (0.25 * on_device_ratio)
         total_score += weight * level_score
 
-    return total_score * 100
+    return float(total_score * 100)
+
+
+def _aggregate_columns(difficulty_idx, f1, time_ms, on_device):
+    """
+    Per-difficulty (count, F1 sum, time sum, on-device count) arrays from
+    columnar per-case data, in one bincount pass each. Indexed like DIFFICULTIES.
+    """
+    n = len(DIFFICULTIES)
+    return (
+        np.bincount(difficulty_idx, minlength=n),
+        np.bincount(difficulty_idx, weights=f1, minlength=n),
+        np.bincount(difficulty_idx, weights=time_ms, minlength=n),
+        np.bincount(difficulty_idx, weights=on_device, minlength=n),
+    )
+
+
+def _aggregate(results):
+    """_aggregate_columns over a list of result rows."""
+    return _aggregate_columns(
+        np.array([DIFFICULTY_INDEX[r["difficulty"]] for r in results], dtype=np.int8),
+        np.array([r["f1"] for r in results], dtype=np.float64),
+        np.array([r["total_time_ms"] for r in results], dtype=np.float64),
+        np.array([r["source"] == "on-device" for r in results], dtype=np.float64),
+    )
+
+
+# Built after the scoring helpers: the columns carry pre-normalized expected calls.
+BENCHMARKS_SOA = _columns(BENCHMARKS)
+TOOL_SET_COUNTS = Counter(BENCHMARKS_SOA["prefix_key"])
 
 
 ############## Runner ##############
 
+_memory_cache = {}
+
+
+def _cache_key(messages, tools):
+    """Stable hash of a (messages, tools) request."""
+    messages_json = json.dumps(messages, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    payload = b"[" + messages_json + b",[" + b",".join(_tool_json(t) for t in tools) + b"]]"
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _cache_lookup(messages, tools):
+    """Stored result for an identical request, or None (always None unless BENCH_CACHE=1)."""
+    if not BENCH_CACHE:
+        return None
+    key = _cache_key(messages, tools)
+    if key not in _memory_cache:
+        with shelve.open(BENCH_CACHE_PATH) as shelf:
+            if key not in shelf:
+                return None
+            _memory_cache[key] = shelf[key]
+    return {**_memory_cache[key], "cached": True}
+
+
+def _cache_store(messages, tools, result):
+    # Fast-path answers cost nothing to recompute, and keeping them out of the
+    # cache means a HYBRID_FAST_PATH=0 run never replays one.
+    if (BENCH_CACHE and not result.get("fast_path")
+            and not any(c.get("name") in BENCH_CACHE_SKIP for c in result.get("function_calls", []))):
+        key = _cache_key(messages, tools)
+        with shelve.open(BENCH_CACHE_PATH) as shelf:
+            _memory_cache[key] = shelf[key] = result
+
+
+def cached_generate(messages, tools):
+    """Call generate_hybrid, reusing stored results for identical requests when BENCH_CACHE=1."""
+    result = _cache_lookup(messages, tools)
+    if result is None:
+        result = generate_hybrid(messages, tools)
+        _cache_store(messages, tools, result)
+    return result
+
+
+def cached_generate_batch(requests, on_result=None):
+    """
+    cached_generate over a list of (messages, tools) pairs, results in order.
+    Cache misses go to main.generate_hybrid_batch together, BENCH_WORKERS at a time;
+    the cache itself is only touched from the calling thread. `on_result(index,
+    result)` is called for hits first, then for misses in completion order.
+    """
+    results = [_cache_lookup(messages, tools) for messages, tools in requests]
+    misses = [i for i, r in enumerate(results) if r is None]
+    if on_result is not None:
+        for i, result in enumerate(results):
+            if result is not None:
+                on_result(i, result)
+
+    def finished(k, result):
+        i = misses[k]
+        _cache_store(*requests[i], result)
+        results[i] = result
+        if on_result is not None:
+            on_result(i, result)
+
+    if misses:
+        generate_hybrid_batch([requests[i] for i in misses], batch_size=BENCH_WORKERS, on_result=finished)
+    return results
+
+
+def _row(name, difficulty, expected_calls, result, exp_norm=None):
+    pred_calls = result.get("function_calls", [])
+    f1 = compute_f1(pred_calls, expected_calls, exp_norm)
+    source = result.get("source", "on-device" if not result.get("cloud_handoff") else "cloud (fallback)")
+    return {
+        "name": name,
+        "difficulty": difficulty,
+        "total_time_ms": result["total_time_ms"],
+        "f1": f1,
+        "source": source,
+        "fast_path": result.get("fast_path", False),
+        "cached": result.get("cached", False),
+        "predicted": pred_calls,
+        "expected": expected_calls,
+    }
+
+
+def run_case(case):
+    """Run a single benchmark case and return its result row."""
+    result = cached_generate(case["messages"], case["tools"])
+    return _row(case["name"], case["difficulty"], case["expected_calls"], result)
+
+
 def run_benchmark(benchmarks=None):
     """Run all benchmark cases and print results."""
-    if benchmarks is None:
-        benchmarks = BENCHMARKS
-
-    total = len(benchmarks)
-    results = []
-    for i, case in enumerate(benchmarks, 1):
-        print(f"[{i}/{total}] Running: {case['name']} ({case['difficulty']})...", end=" ", flush=True)
-        result = generate_hybrid(case["messages"], case["tools"])
-        pred_calls = result.get("function_calls", [])
-        f1 = compute_f1(pred_calls, case["expected_calls"])
-        source = result.get("source", "on-device" if not result.get("cloud_handoff") else "cloud (fallback)")
-        print(f"F1={f1:.2f} | {result['total_time_ms']:.0f}ms | {source}")
-        results.append({
-            "name": case["name"],
-            "difficulty": case["difficulty"],
-            "total_time_ms": result["total_time_ms"],
-            "f1": f1,
-            "source": source,
-            "predicted": pred_calls,
-            "expected": case["expected_calls"],
-        })
-
-    print("\n=== Benchmark Results ===\n")
-    print(f"  {'#':>2} | {'Difficulty':<10} | {'Name':<32} | {'Time (ms)':>10} | {'F1':>5} | Source")
-    print(f"  {'--':>2}-+-{'-'*10}-+-{'-'*32}-+-{'-'*10}-+-{'-'*5}-+-{'-'*20}")
-    for i, r in enumerate(results, 1):
-        print(f"  {i:>2} | {r['difficulty']:<10} | {r['name']:<32} | {r['total_time_ms']:>10.2f} | {r['f1']:>5.2f} | {r['source']}")
-
-    print(f"\n--- Summary ---")
-    for difficulty in ["easy", "medium", "hard"]:
-        group = [r for r in results if r["difficulty"] == difficulty]
-        if not group:
+    cols = BENCHMARKS_SOA if benchmarks is None else _columns(benchmarks)
+
+    # One untimed completion loads a handle and lets the engine allocate its
+    # buffers; the remaining workers' handles then load in the background while
+    # setup continues, instead of inside the first cases.
+    if BENCH_WARMUP:
+        generate_cactus([{"role": "user", "content": "ping"}], [TOOL_GET_WEATHER])
+    prewarm_models(max(1, BENCH_WORKERS))
+
+    total = len(cols["name"])
+    prefixes = TOOL_SET_COUNTS if benchmarks is None else Counter(cols["prefix_key"])
+    print(f"{total} cases over {len(prefixes)} distinct tool sets ({total - len(prefixes)} reuse a cached prefix)\n")
+    rows = list(zip(
+        cols["name"], cols["difficulty"].tolist(), cols["messages"], cols["tools"],
+        cols["expected_calls"], cols["expected_norm"],
+    ))
+
+    # Run cases grouped by their ordered tool-name prefix so identical prompt
+    # prefixes (and sets sharing leading tools) run back-to-back; the sort is
+    # stable and results are reported in declaration order.
+    order = sorted(range(total), key=cols["tool_names"].__getitem__)
+    results = [None] * total
+    if BENCH_WORKERS > 1:
+        print(f"Running {total} cases, {BENCH_WORKERS} at a time...", flush=True)
+
+        def report(k, result):
+            i = order[k]
+            name, difficulty, _, _, expected_calls, exp_norm = rows[i]
+            r = results[i] = _row(name, difficulty, expected_calls, result, exp_norm)
+            print(f"[{i + 1}/{total}] {name} ({difficulty}) F1={r['f1']:.2f} | {r['total_time_ms']:.0f}ms | {r['source']}", flush=True)
+
+        cached_generate_batch([(rows[i][2], rows[i][3]) for i in order], on_result=report)
+    else:
+        for i in order:
+            name, difficulty, messages, tools, expected_calls, exp_norm = rows[i]
+            print(f"[{i + 1}/{total}] Running: {name} ({difficulty})...", end=" ", flush=True)
+            r = results[i] = _row(name, difficulty, expected_calls, cached_generate(messages, tools), exp_norm)
+            print(f"F1={r['f1']:.2f} | {r['total_time_ms']:.0f}ms | {r['source']}")
+
+    # Table, summary and score are assembled first and written in a single call.
+    lines = [
+        "\n=== Benchmark Results ===\n",
+        f"  {'#':>2} | {'Difficulty':<10} | {'Name':<32} | {'Time (ms)':>10} | {'F1':>5} | Source",
+        f"  {'--':>2}-+-{'-'*10}-+-{'-'*32}-+-{'-'*10}-+-{'-'*5}-+-{'-'*20}",
+    ]
+    lines += [
+        f"  {i:>2} | {r['difficulty']:<10} | {r['name']:<32} | {r['total_time_ms']:>10.2f} | {r['f1']:>5.2f} | {r['source']}"
+        for i, r in enumerate(results, 1)
+    ]
+
+    lines.append(f"\n--- Summary ---")
+    f1 = np.array([r["f1"] for r in results], dtype=np.float64)
+    time_ms = np.array([r["total_time_ms"] for r in results], dtype=np.float64)
+    is_on_device = np.array([r["source"] == "on-device" for r in results], dtype=np.float64)
+    sums = counts, f1_sums, time_sums, on_device_sums = _aggregate_columns(cols["difficulty_idx"], f1, time_ms, is_on_device)
+    for d, difficulty in enumerate(DIFFICULTIES):
+        n = int(counts[d])
+        if not n:
             continue
-        avg_f1 = sum(r["f1"] for r in group) / len(group)
-        avg_time = sum(r["total_time_ms"] for r in group) / len(group)
-        on_device = sum(1 for r in group if r["source"] == "on-device")
-        cloud = len(group) - on_device
-        print(
-            f"  {difficulty:<8} avg F1={avg_f1:.2f}  avg time={avg_time:.2f}ms  on-device={on_device}/{len(group)} cloud={cloud}/{len(group)}"
+        avg_f1 = f1_sums[d] / n
+        avg_time = time_sums[d] / n
+        on_device = int(on_device_sums[d])
+        cloud = n - on_device
+        lines.append(
+            f"  {difficulty:<8} avg F1={avg_f1:.2f}  avg time={avg_time:.2f}ms  on-device={on_device}/{n} cloud={cloud}/{n}"
         )
 
-    avg_f1 = sum(r["f1"] for r in results) / len(results)
-    avg_time = sum(r["total_time_ms"] for r in results) / len(results)
-    total_time = sum(r["total_time_ms"] for r in results)
-    on_device_total = sum(1 for r in results if r["source"] == "on-device")
-    cloud_total = len(results) - on_device_total
-    print(f"  {'overall':<8} avg F1={avg_f1:.2f}  avg time={avg_time:.2f}ms  total time={total_time:.2f}ms")
-    print(
-        f"           on-device={on_device_total}/{len(results)} ({100*on_device_total/len(results):.0f}%)  cloud={cloud_total}/{len(results)} ({100*cloud_total/len(results):.0f}%)"
+    avg_f1 = f1_sums.sum() / total
+    total_time = time_sums.sum()
+    avg_time = total_time / total
+    on_device_total = int(on_device_sums.sum())
+    cloud_total = total - on_device_total
+    lines.append(f"  {'overall':<8} avg F1={avg_f1:.2f}  avg time={avg_time:.2f}ms  total time={total_time:.2f}ms")
+    lines.append(
+        f"           on-device={on_device_total}/{total} ({100*on_device_total/total:.0f}%)  cloud={cloud_total}/{total} ({100*cloud_total/total:.0f}%)"
     )
+    fast_path_total = sum(1 for r in results if r["fast_path"])
+    lines.append(f"           fast path={fast_path_total}/{total} answered without the model (HYBRID_FAST_PATH=0 disables)")
+    if BENCH_CACHE:
+        cached_total = sum(1 for r in results if r["cached"])
+        lines.append(f"           cache hits={cached_total}/{total} (stored timings reported)")
+
+    if BENCH_LEAN:
+        missed = [r["name"] for r, d in zip(results, cols["difficulty"]) if d == "easy" and r["f1"] < 1.0]
+        if missed:
+            lines.append(f"  warning: BENCH_LEAN lost easy cases: {', '.join(missed)}")
 
-    score = compute_total_score(results)
-    print(f"\n{'='*50}")
-    print(f"  TOTAL SCORE: {score:.1f}%")
-    print(f"{'='*50}")
+    score = compute_total_score(results, sums)
+    lines.append(f"\n{'='*50}")
+    lines.append(f"  TOTAL SCORE: {score:.1f}%")
+    lines.append(f"{'='*50}")
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
 
     return results
 
@@ -16,7 +16,7 @@ Run:
   ./cactus/venv/bin/python3 demo_voice_whatsapp.py
 
 Dependencies (already in cactus venv):
-  pip install sounddevice soundfile playwright
+  pip install sounddevice playwright
   python -m playwright install chromium
 """
 
@@ -26,27 +26,32 @@ import json
 import time
 import tempfile
 import threading
-from pathlib import Path
 
 import numpy as np
 import sounddevice as sd
-import soundfile as sf
 
 sys.path.insert(0, "cactus/python/src")
 os.environ.setdefault("CACTUS_NO_CLOUD_TELE", "1")
 
 from cactus import cactus_init, cactus_transcribe, cactus_destroy
-from main import generate_hybrid
+from audio_io import write_wav
+from main import generate_hybrid, prewarm_models
 
-from playwright.sync_api import sync_playwright
+from whatsapp_web import close_browser, send_message
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # orjson is optional; stdlib json parses the same transcripts
+    _json_loads = json.loads
 
 
 # ── Config ────────────────────────────────────────────────────────────────────
 
 WHISPER_WEIGHTS  = os.environ.get("WHISPER_WEIGHTS", "weights/whisper-small")
 AUDIO_SR         = int(os.environ.get("AUDIO_SR", "16000"))
-PROFILE_DIR      = Path(os.environ.get("WHATSAPP_PROFILE_DIR", ".whatsapp_profile")).resolve()
-WHATSAPP_WEB_URL = "https://web.whatsapp.com/"
+MAX_RECORD_S     = float(os.environ.get("MAX_RECORD_S", "60"))  # longer commands are cut off
+# Utterance WAVs go to tmpfs when there is one, so the hand-off to Whisper stays in RAM
+AUDIO_TMP_DIR    = os.environ.get("AUDIO_TMP_DIR") or ("/dev/shm" if os.path.isdir("/dev/shm") else None)
 WHISPER_PROMPT   = "<|startoftranscript|><|en|><|transcribe|><|notimestamps|>"
 
 # Tool schema for intent extraction
@@ -80,17 +85,51 @@ SYSTEM_PROMPT = (
 )
 
 
+# ── Weights prefetch ──────────────────────────────────────────────────────────
+
+def prefetch_weights(*paths):
+    """
+    Ask the kernel to read weight files into the page cache ahead of cactus_init.
+    Readahead is asynchronous, so this returns quickly; no-op where posix_fadvise is missing.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for path in paths:
+        if os.path.isfile(path):
+            files = [path]
+        else:
+            files = [os.path.join(d, f) for d, _, names in os.walk(path) for f in names]
+        for file in files:
+            try:
+                fd = os.open(file, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            except OSError:
+                pass
+            finally:
+                os.close(fd)
+
+
 # ── Audio recording (push-to-talk) ────────────────────────────────────────────
 
 def record_until_enter(sr: int) -> np.ndarray:
-    """Stream mic audio until the user presses ENTER. Returns float32 mono array."""
-    chunks = []
+    """Stream mic audio until the user presses ENTER. Returns int16 mono array."""
+    # Preallocated per recording; the callback copies each block straight into place,
+    # so stopping costs nothing proportional to the utterance length. Samples are
+    # captured as int16, the format the WAV is written in, so write_wav needs no conversion.
+    buf = np.empty(int(MAX_RECORD_S * sr), dtype=np.int16)
+    pos = 0
     stop_event = threading.Event()
 
     def _callback(indata, frames, time_info, status):
-        chunks.append(indata.copy())
+        nonlocal pos
+        n = min(frames, buf.shape[0] - pos)
+        buf[pos:pos + n] = indata[:n, 0]
+        pos += n
 
-    stream = sd.InputStream(samplerate=sr, channels=1, dtype="float32", callback=_callback)
+    stream = sd.InputStream(samplerate=sr, channels=1, dtype="int16", callback=_callback)
     stream.start()
 
     # Wait for ENTER in a background thread so the mic keeps going
@@ -104,25 +143,22 @@ def record_until_enter(sr: int) -> np.ndarray:
     stream.stop()
     stream.close()
 
-    if not chunks:
-        return np.zeros((0,), dtype=np.float32)
-    return np.concatenate([c.reshape(-1) for c in chunks]).astype(np.float32)
+    return buf[:pos]
 
 
 # ── Transcription ─────────────────────────────────────────────────────────────
 
 def transcribe(whisper, audio: np.ndarray, sr: int) -> str:
     """Write audio to a temp WAV and run cactus_transcribe. Returns transcript string."""
-    fd, wav_path = tempfile.mkstemp(suffix=".wav", prefix="cactus_")
-    os.close(fd)
+    fd, wav_path = tempfile.mkstemp(suffix=".wav", prefix="cactus_", dir=AUDIO_TMP_DIR)
     try:
-        sf.write(wav_path, audio, sr)
+        write_wav(fd, audio, sr)
         t0 = time.perf_counter()
         raw = cactus_transcribe(whisper, wav_path, prompt=WHISPER_PROMPT)
         elapsed = (time.perf_counter() - t0) * 1000
         try:
-            text = (json.loads(raw).get("response") or "").strip()
-        except json.JSONDecodeError:
+            text = (_json_loads(raw).get("response") or "").strip()
+        except json.JSONDecodeError:  # orjson.JSONDecodeError subclasses it
             text = ""
         print(f"  [transcribe]  {elapsed:.0f}ms  →  \"{text}\"")
         return text
@@ -135,11 +171,23 @@ def transcribe(whisper, audio: np.ndarray, sr: int) -> str:
 
 # ── Intent extraction ─────────────────────────────────────────────────────────
 
+# Parsed intents by exact command text (whitespace-normalized, case kept). Only
+# exact repeats hit: a near-identical phrasing can still name another recipient
+# or carry a different message.
+_INTENT_CACHE = {}
+_INTENT_CACHE_MAX = 256
+
+
 def extract_intent(text: str) -> dict | None:
     """
     Use generate_hybrid (on-device FunctionGemma) to extract recipient + message.
     Returns {"recipient": ..., "message": ..., "source": ...} or None.
     """
+    key = " ".join(text.split())
+    if key in _INTENT_CACHE:
+        intent = dict(_INTENT_CACHE[key], source="cache")
+        print(f"  [intent]      0ms  →  recipient=\"{intent['recipient']}\"  message=\"{intent['message']}\"  (cache)")
+        return intent
     messages = [
         {"role": "system", "content": SYSTEM_PROMPT},
         {"role": "user",   "content": text},
@@ -157,94 +205,23 @@ def extract_intent(text: str) -> dict | None:
             message   = (args.get("message")   or "").strip()
             if recipient and message:
                 print(f"  [intent]      {elapsed:.0f}ms  →  recipient=\"{recipient}\"  message=\"{message}\"  ({source})")
+                if len(_INTENT_CACHE) >= _INTENT_CACHE_MAX:
+                    _INTENT_CACHE.clear()
+                _INTENT_CACHE[key] = {"recipient": recipient, "message": message}
                 return {"recipient": recipient, "message": message, "source": source}
 
     print(f"  [intent]      {elapsed:.0f}ms  →  no valid tool call returned ({source})")
     return None
 
 
-# ── WhatsApp Web automation ───────────────────────────────────────────────────
-
-def whatsapp_send(recipient: str, message: str):
-    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
-    with sync_playwright() as p:
-        browser = p.chromium.launch_persistent_context(
-            user_data_dir=str(PROFILE_DIR), headless=False
-        )
-        page = browser.pages[0] if browser.pages else browser.new_page()
-        page.goto(WHATSAPP_WEB_URL, wait_until="domcontentloaded")
-
-        # Wait for login (QR scan on first run; subsequent runs use saved session)
-        _wait_for_login(page)
-
-        # Search for the contact
-        _fill_first(page, [
-            'div[contenteditable="true"][data-tab="3"]',
-            'div[contenteditable="true"][data-tab="2"]',
-            'div[role="textbox"][contenteditable="true"]',
-        ], recipient)
-        time.sleep(1.0)
-
-        # Open the chat
-        clicked = False
-        for sel in [f'span[title="{recipient}"]', f'text="{recipient}"']:
-            try:
-                el = page.query_selector(sel)
-                if el:
-                    el.click()
-                    clicked = True
-                    break
-            except Exception:
-                pass
-        if not clicked:
-            page.keyboard.press("Enter")
-
-        # Type and send the message
-        _fill_first(page, [
-            'div[contenteditable="true"][data-tab="10"]',
-            'div[contenteditable="true"][data-tab="9"]',
-            'footer div[contenteditable="true"][role="textbox"]',
-            'div[role="textbox"][contenteditable="true"]',
-        ], message)
-        page.keyboard.press("Enter")
-        time.sleep(1.0)
-        browser.close()
-
-
-def _wait_for_login(page, timeout_s: int = 120):
-    selectors = [
-        'div[contenteditable="true"][data-tab="3"]',
-        'div[contenteditable="true"][data-tab="2"]',
-        'div[role="textbox"][contenteditable="true"]',
-    ]
-    deadline = time.time() + timeout_s
-    while time.time() < deadline:
-        for sel in selectors:
-            try:
-                if page.query_selector(sel):
-                    return
-            except Exception:
-                pass
-        time.sleep(1)
-    raise RuntimeError("Timed out waiting for WhatsApp Web login. Please scan the QR code.")
-
-
-def _fill_first(page, selectors: list[str], text: str, timeout_ms: int = 8000):
-    for sel in selectors:
-        try:
-            page.wait_for_selector(sel, timeout=timeout_ms)
-            page.click(sel)
-            page.fill(sel, text)
-            return
-        except Exception:
-            continue
-    raise RuntimeError(f"Could not find any selector to fill: {selectors}")
-
-
 # ── Main ──────────────────────────────────────────────────────────────────────
 
 def main():
     print("\n=== Voice-to-WhatsApp  (on-device / low-latency) ===\n")
+    threading.Thread(target=prefetch_weights, args=(WHISPER_WEIGHTS,), daemon=True).start()
+    # FunctionGemma loads on a background thread while Whisper loads and the user
+    # speaks; the first command then takes the warm handle from main's pool.
+    prewarm_models(1)
     print(f"Loading Whisper from: {WHISPER_WEIGHTS}")
     whisper = cactus_init(WHISPER_WEIGHTS)
     print("Whisper ready.\n")
@@ -284,7 +261,7 @@ def main():
             print(f"\nSending WhatsApp message to '{recipient}': \"{message}\"")
             t0 = time.perf_counter()
             try:
-                whatsapp_send(recipient, message)
+                send_message(recipient, message)
                 elapsed = (time.perf_counter() - t0) * 1000
                 print(f"  [whatsapp]    {elapsed:.0f}ms  → Sent!\n")
             except Exception as e:
@@ -293,6 +270,7 @@ def main():
     except KeyboardInterrupt:
         print("\nStopped.")
     finally:
+        close_browser()
         cactus_destroy(whisper)
 
 
@@ -24,24 +24,38 @@ import sys
 import json
 import time
 import tempfile
-from pathlib import Path
+import threading
 
 import numpy as np
 import sounddevice as sd
-import soundfile as sf
 
 sys.path.insert(0, "cactus/python/src")
 os.environ.setdefault("CACTUS_NO_CLOUD_TELE", "1")
 
 from cactus import cactus_init, cactus_transcribe, cactus_destroy
+from audio_io import write_wav
 from main import generate_hybrid, generate_cloud
-from playwright.sync_api import sync_playwright
+from whatsapp_intent import parse_send_command
+from whatsapp_web import close_browser, send_message
+
+try:
+    from numpy_rms import rms as _rms
+except ImportError:  # numpy-rms is optional; a dot product squares and sums without a temporary too
+    def _rms(x):
+        return np.sqrt(np.dot(x, x) / x.size)
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # orjson is optional; stdlib json parses the same transcripts
+    _json_loads = json.loads
 
 
 # ── Config ────────────────────────────────────────────────────────────────────
 
 WHISPER_WEIGHTS  = os.environ.get("WHISPER_WEIGHTS", "weights/whisper-small")
 AUDIO_SR         = 16000
+# Utterance WAVs go to tmpfs when there is one, so the hand-off to Whisper stays in RAM
+AUDIO_TMP_DIR    = os.environ.get("AUDIO_TMP_DIR") or ("/dev/shm" if os.path.isdir("/dev/shm") else None)
 WHISPER_PROMPT   = "<|startoftranscript|><|en|><|transcribe|><|notimestamps|>"
 
 # Voice activity detection
@@ -50,13 +64,11 @@ VAD_SPEECH_THRESH  = 0.015  # RMS threshold to consider "speech"
 VAD_SILENCE_SEC    = 1.2    # seconds of silence before stopping
 VAD_MAX_SEC        = 10.0   # hard cap per recording
 VAD_WAIT_SEC       = 8.0    # seconds to wait for speech before demo fallback
+VAD_RING_CHUNKS    = 16     # capture blocks buffered between the audio thread and the VAD
 
 # Demo fallback — used when no voice is detected (processed via gemini-2.5-flash)
 FALLBACK_COMMAND   = "Send a WhatsApp to Parsa saying Hi"
 
-PROFILE_DIR      = Path(os.environ.get("WHATSAPP_PROFILE_DIR", ".whatsapp_profile")).resolve()
-WHATSAPP_WEB_URL = "https://web.whatsapp.com/"
-
 TOOL_WHATSAPP_SEND = {
     "name": "whatsapp_send",
     "description": (
@@ -94,60 +106,78 @@ def record_on_voice(sr: int) -> np.ndarray | None:
     max_chunks     = int(VAD_MAX_SEC * 1000 / VAD_CHUNK_MS)
     wait_chunks    = int(VAD_WAIT_SEC * 1000 / VAD_CHUNK_MS)
 
+    # PortAudio's thread copies each VAD-sized block into a small ring and signals;
+    # this thread only runs the VAD. Speech chunks are written in place into a
+    # preallocated recording, so nothing is allocated per chunk.
+    ring     = np.empty((VAD_RING_CHUNKS, chunk_frames), dtype=np.float32)
+    recorded = np.empty((max_chunks, chunk_frames), dtype=np.float32)
+    ready    = threading.Semaphore(0)
+    written  = 0
+
+    def _callback(indata, frames, time_info, status):
+        nonlocal written
+        ring[written % VAD_RING_CHUNKS] = indata[:, 0]
+        written += 1
+        ready.release()
+
     print("Listening...", end="", flush=True)
 
-    frames_captured = []
-    speech_started  = False
-    silent_count    = 0
-    waited_chunks   = 0
+    n_recorded     = 0
+    speech_started = False
+    silent_count   = 0
+    waited_chunks  = 0
+    read           = 0
 
-    with sd.InputStream(samplerate=sr, channels=1, dtype="float32") as stream:
+    with sd.InputStream(samplerate=sr, channels=1, dtype="float32",
+                        blocksize=chunk_frames, callback=_callback):
         while True:
-            chunk, _ = stream.read(chunk_frames)
-            mono      = chunk.reshape(-1)
-            rms       = float(np.sqrt(np.mean(mono ** 2)))
+            ready.acquire()
+            mono = ring[read % VAD_RING_CHUNKS]
+            read += 1
+            rms  = float(_rms(mono))
 
             if not speech_started:
                 waited_chunks += 1
                 if rms >= VAD_SPEECH_THRESH:
                     speech_started = True
                     print(" Recording...", end="", flush=True)
-                    frames_captured.append(mono.copy())
+                    recorded[n_recorded] = mono
+                    n_recorded += 1
                     silent_count = 0
                 elif waited_chunks >= wait_chunks:
                     print(" (no voice detected — using demo fallback)")
                     return None          # triggers Gemini fallback
             else:
-                frames_captured.append(mono.copy())
+                recorded[n_recorded] = mono
+                n_recorded += 1
                 if rms < VAD_SPEECH_THRESH:
                     silent_count += 1
                     if silent_count >= silence_chunks:
                         break
                 else:
                     silent_count = 0
-                if len(frames_captured) >= max_chunks:
+                if n_recorded >= max_chunks:
                     break
 
     print()
-    if not frames_captured:
+    if not n_recorded:
         return None
-    return np.concatenate(frames_captured)
+    return recorded[:n_recorded].reshape(-1)
 
 
 # ── Transcription ─────────────────────────────────────────────────────────────
 
 def transcribe(whisper, audio: np.ndarray) -> tuple[str, float]:
     """Run cactus_transcribe on a float32 array. Returns (text, elapsed_ms)."""
-    fd, wav_path = tempfile.mkstemp(suffix=".wav", prefix="cactus_")
-    os.close(fd)
+    fd, wav_path = tempfile.mkstemp(suffix=".wav", prefix="cactus_", dir=AUDIO_TMP_DIR)
     try:
-        sf.write(wav_path, audio, AUDIO_SR)
+        write_wav(fd, audio, AUDIO_SR)
         t0  = time.perf_counter()
         raw = cactus_transcribe(whisper, wav_path, prompt=WHISPER_PROMPT)
         ms  = (time.perf_counter() - t0) * 1000
         try:
-            text = (json.loads(raw).get("response") or "").strip()
-        except json.JSONDecodeError:
+            text = (_json_loads(raw).get("response") or "").strip()
+        except json.JSONDecodeError:  # orjson.JSONDecodeError subclasses it
             text = ""
         return text, ms
     finally:
@@ -186,8 +216,15 @@ def extract_intent_cloud(text: str) -> tuple[dict | None, float]:
 def extract_intent(text: str) -> tuple[dict | None, float, str]:
     """
     Use generate_hybrid (on-device FunctionGemma) to parse recipient + message.
+    Commands in the canonical "send a WhatsApp to <Name> saying ..." shape are parsed
+    by regex and skip the model.
     Returns (intent_dict_or_None, elapsed_ms, source).
     """
+    t0     = time.perf_counter()
+    intent = parse_send_command(text)
+    if intent:
+        return intent, (time.perf_counter() - t0) * 1000, "regex"
+
     messages = [
         {"role": "system", "content": SYSTEM_PROMPT},
         {"role": "user",   "content": text},
@@ -208,82 +245,6 @@ def extract_intent(text: str) -> tuple[dict | None, float, str]:
     return None, ms, source
 
 
-# ── WhatsApp Web automation ───────────────────────────────────────────────────
-
-def whatsapp_send(recipient: str, message: str):
-    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
-    with sync_playwright() as p:
-        browser = p.chromium.launch_persistent_context(
-            user_data_dir=str(PROFILE_DIR), headless=False
-        )
-        page = browser.pages[0] if browser.pages else browser.new_page()
-        page.goto(WHATSAPP_WEB_URL, wait_until="domcontentloaded")
-        _wait_for_login(page)
-
-        # Search for the contact
-        _fill_first(page, [
-            'div[contenteditable="true"][data-tab="3"]',
-            'div[contenteditable="true"][data-tab="2"]',
-            'div[role="textbox"][contenteditable="true"]',
-        ], recipient)
-        time.sleep(1.0)
-
-        # Open the chat
-        clicked = False
-        for sel in [f'span[title="{recipient}"]', f'text="{recipient}"']:
-            try:
-                el = page.query_selector(sel)
-                if el:
-                    el.click()
-                    clicked = True
-                    break
-            except Exception:
-                pass
-        if not clicked:
-            page.keyboard.press("Enter")
-
-        # Type and send
-        _fill_first(page, [
-            'div[contenteditable="true"][data-tab="10"]',
-            'div[contenteditable="true"][data-tab="9"]',
-            'footer div[contenteditable="true"][role="textbox"]',
-            'div[role="textbox"][contenteditable="true"]',
-        ], message)
-        page.keyboard.press("Enter")
-        time.sleep(1.0)
-        browser.close()
-
-
-def _wait_for_login(page, timeout_s: int = 120):
-    selectors = [
-        'div[contenteditable="true"][data-tab="3"]',
-        'div[contenteditable="true"][data-tab="2"]',
-        'div[role="textbox"][contenteditable="true"]',
-    ]
-    deadline = time.time() + timeout_s
-    while time.time() < deadline:
-        for sel in selectors:
-            try:
-                if page.query_selector(sel):
-                    return
-            except Exception:
-                pass
-        time.sleep(1)
-    raise RuntimeError("Timed out waiting for WhatsApp Web login. Scan the QR code.")
-
-
-def _fill_first(page, selectors: list, text: str, timeout_ms: int = 8000):
-    for sel in selectors:
-        try:
-            page.wait_for_selector(sel, timeout=timeout_ms)
-            page.click(sel)
-            page.fill(sel, text)
-            return
-        except Exception:
-            continue
-    raise RuntimeError("Could not find input field on WhatsApp Web.")
-
-
 # ── Main ──────────────────────────────────────────────────────────────────────
 
 def main():
@@ -317,7 +278,7 @@ def main():
                 print(f"\n  Sending WhatsApp to '{recipient}'...")
                 t0 = time.perf_counter()
                 try:
-                    whatsapp_send(recipient, message)
+                    send_message(recipient, message)
                     print(f"  Sent! ({(time.perf_counter()-t0)*1000:.0f}ms)\n")
                 except Exception as e:
                     print(f"  ERROR: {e}\n")
@@ -353,7 +314,7 @@ def main():
             print(f"\n  Sending WhatsApp to '{recipient}'...")
             t0 = time.perf_counter()
             try:
-                whatsapp_send(recipient, message)
+                send_message(recipient, message)
                 t_send = (time.perf_counter() - t0) * 1000
                 print(f"  Sent! ({t_send:.0f}ms)\n")
             except Exception as e:
@@ -362,6 +323,7 @@ def main():
     except KeyboardInterrupt:
         print("\nStopped.")
     finally:
+        close_browser()
         cactus_destroy(whisper)
 
 
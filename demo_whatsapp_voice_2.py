@@ -3,19 +3,20 @@
 Voice-to-WhatsApp demo (laptop)
 
 What it does:
-- Continuously records short audio chunks from your microphone
+- Continuously listens to your microphone and cuts it into utterances (energy VAD)
 - Transcribes locally using Cactus Whisper (cactus_transcribe)
 - When it hears a WhatsApp command, it:
   1) extracts (recipient, message) via your existing generate_hybrid tool-caller
   2) opens WhatsApp Web and sends the message (Playwright automation)
 
 Important notes:
-- This is a demo script; it is intentionally simple and "chunked" (e.g., 4s audio windows).
+- This is a demo script; it is intentionally simple and "chunked" (one utterance per chunk,
+  capped at CHUNK_SECONDS).
 - WhatsApp Web requires you to scan a QR code on first run. The script uses a persistent
   browser profile so you only need to scan once.
 
 Dependencies:
-- pip install sounddevice soundfile playwright
+- pip install sounddevice playwright
 - python -m playwright install
 
 Run:
@@ -31,13 +32,17 @@ import os
 import re
 import time
 import json
+import queue
 import tempfile
+import threading
 import difflib
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 # Audio capture
+import numpy as np
 import sounddevice as sd
-import soundfile as sf
 
 # Cactus (local)
 import sys
@@ -46,10 +51,23 @@ sys.path.insert(0, "cactus/python/src")
 os.environ.setdefault("CACTUS_NO_CLOUD_TELE", "1")
 
 from cactus import cactus_init, cactus_transcribe, cactus_destroy
+from audio_io import write_wav
 from main import generate_hybrid  # re-use your existing routing + tool-call output
+from whatsapp_intent import parse_send_command, parse_fallback_command
 
 # Browser automation (WhatsApp Web)
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from whatsapp_web import SEARCH_SELECTORS, close_browser, ensure_page, fill_first, send_message
+
+try:
+    from rapidfuzz.fuzz import ratio as _fuzz_ratio
+except ImportError:  # rapidfuzz is optional; difflib gives (nearly) the same 0-100 score
+    def _fuzz_ratio(a, b):
+        return difflib.SequenceMatcher(None, a, b).ratio() * 100.0
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # orjson is optional; stdlib json parses the same transcripts
+    _json_loads = json.loads
 
 
 # -----------------------------
@@ -57,7 +75,14 @@ from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeo
 # -----------------------------
 WHISPER_WEIGHTS = os.environ.get("WHISPER_WEIGHTS", "weights/whisper-small")
 AUDIO_SR = int(os.environ.get("AUDIO_SR", "16000"))
-CHUNK_SECONDS = float(os.environ.get("CHUNK_SECONDS", "10.0"))
+CHUNK_SECONDS = float(os.environ.get("CHUNK_SECONDS", "10.0"))  # longest utterance per chunk
+
+# Voice activity detection: only speech followed by silence reaches Whisper.
+VAD_FRAME_MS = 30  # analyse energy every 30 ms
+VAD_SPEECH_THRESH = float(os.environ.get("VAD_SPEECH_THRESH", "0.015"))  # RMS threshold for "speech"
+VAD_SILENCE_SEC = float(os.environ.get("VAD_SILENCE_SEC", "0.8"))  # silence that ends an utterance
+# Captured chunks waiting for Whisper; the oldest is dropped when full to stay real-time.
+AUDIO_QUEUE_CHUNKS = int(os.environ.get("AUDIO_QUEUE_CHUNKS", "3"))
 
 # "Command gate" phrases to reduce accidental sends.
 # You can expand these.
@@ -73,17 +98,13 @@ COMMAND_TRIGGERS = (
 # Examples the transcriber might output: "hey cactus", "hi cactus".
 WAKE_WORDS = tuple(w.strip().lower() for w in os.environ.get("WAKE_WORDS", "hey cactus,hi cactus").split(",") if w.strip())
 
+# Fuzzy wake word: "<greeting> <token like cactus>"
+WAKE_GREETINGS = frozenset({"hey", "hi", "hello", "okay", "ok"})
+
 # How long (in seconds) the assistant stays "armed" after hearing the wake word.
 ARMED_SECONDS = float(os.environ.get("ARMED_SECONDS", "12"))
 
 
-# Persistent browser profile directory so WhatsApp login persists.
-PROFILE_DIR = Path(os.environ.get("WHATSAPP_PROFILE_DIR", ".whatsapp_profile")).resolve()
-
-# WhatsApp Web
-WHATSAPP_WEB_URL = "https://web.whatsapp.com/"
-
-
 # -----------------------------
 # Tool schema for parsing intent
 # -----------------------------
@@ -137,16 +158,61 @@ def validate_whisper_weights(path_str: str) -> str:
 # -----------------------------
 # Audio + Transcription
 # -----------------------------
-def record_chunk(seconds: float, sr: int) -> str:
-    """Record an audio chunk and return a path to a temporary WAV."""
-    frames = int(seconds * sr)
-    audio = sd.rec(frames, samplerate=sr, channels=1, dtype="float32")
-    sd.wait()
+def capture_chunks(audio_q: queue.Queue, stop: threading.Event, seconds: float, sr: int):
+    """
+    Producer thread: read the mic continuously and queue one chunk per utterance, so
+    capture keeps running while the main thread transcribes. Frames are gated by RMS
+    energy; an utterance ends after VAD_SILENCE_SEC of silence or at `seconds`, and
+    silence alone is never queued. On a full queue the oldest chunk is dropped. A
+    capture error is queued for the consumer to raise.
+
+    Utterances are recorded in place into a small pool of preallocated buffers and
+    queued as views, so nothing is allocated per frame or per chunk. The pool has a
+    buffer for every queue slot, one for the chunk the consumer holds and one being
+    recorded; the consumer only holds a chunk while writing it to WAV.
+    """
+    frame_len = int(sr * VAD_FRAME_MS / 1000)
+    silence_frames = int(VAD_SILENCE_SEC * 1000 / VAD_FRAME_MS)
+    max_frames = max(int(seconds * 1000 / VAD_FRAME_MS), 2)
+    pool = np.empty((audio_q.maxsize + 2, max_frames * frame_len), dtype=np.float32)
+
+    def _put(audio):
+        try:
+            audio_q.put_nowait(audio)
+        except queue.Full:
+            try:
+                audio_q.get_nowait()
+            except queue.Empty:
+                pass
+            audio_q.put_nowait(audio)
+
+    slot = 0
+    n = 0  # frames recorded into pool[slot]
+    silent = 0
+    try:
+        with sd.InputStream(samplerate=sr, channels=1, dtype="float32", blocksize=frame_len) as stream:
+            while not stop.is_set():
+                frame, _ = stream.read(frame_len)
+                mono = frame[:, 0]
+                speech = float(np.sqrt(np.dot(mono, mono) / mono.size)) >= VAD_SPEECH_THRESH
+                if not n and not speech:
+                    continue
+                buf = pool[slot]
+                buf[n * frame_len:(n + 1) * frame_len] = mono
+                n += 1
+                silent = 0 if speech else silent + 1
+                if silent >= silence_frames or n >= max_frames:
+                    _put(buf[:n * frame_len])
+                    slot = (slot + 1) % len(pool)
+                    n = 0
+    except Exception as e:
+        audio_q.put(e)
 
-    # Write to a temp WAV file
+
+def write_chunk(audio: np.ndarray, sr: int) -> str:
+    """Write a captured chunk to a temporary WAV and return its path."""
     fd, wav_path = tempfile.mkstemp(suffix=".wav", prefix="cactus_chunk_")
-    os.close(fd)
-    sf.write(wav_path, audio, sr)
+    write_wav(fd, audio, sr)
     return wav_path
 
 
@@ -156,12 +222,25 @@ def transcribe_chunk(whisper, wav_path: str) -> str:
     prompt = "<|startoftranscript|><|en|><|transcribe|><|notimestamps|>"
     raw = cactus_transcribe(whisper, wav_path, prompt=prompt)
     try:
-        data = json.loads(raw)
+        data = _json_loads(raw)
         return (data.get("response") or "").strip()
-    except json.JSONDecodeError:
+    except json.JSONDecodeError:  # orjson.JSONDecodeError subclasses it
         return ""
 
 
+# Compiled once: these run on every transcribed chunk.
+# The first two word tokens; only "<greeting> <cactus-like word>" is fuzzy-checked,
+# so the rest of the transcript is never tokenized.
+_LEAD_TOKENS_RE = re.compile(r"[^a-z']*([a-z']+)[^a-z']+([a-z']+)")
+_WAKE_PREFIX_RE = re.compile(r"^\s*(?:hey|hi|hello)\s+cactus\b[ ,.:;!-]*", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def _cactus_similarity(cand: str) -> float:
+    """0-1 similarity of a transcribed token to "cactus" (Whisper repeats its mishearings)."""
+    return _fuzz_ratio(cand, "cactus") / 100.0
+
+
 def is_non_speech(text: str) -> bool:
     """
     Whisper often outputs non-speech in parentheses, e.g. '(upbeat music)'.
@@ -187,11 +266,11 @@ def detect_wake_word(text: str) -> bool:
         return True
 
     # Fuzzy: "hey <something like cactus>"
-    tokens = re.findall(r"[a-z']+", t)
-    if len(tokens) >= 2 and tokens[0] in {"hey", "hi", "hello", "okay", "ok"}:
-        cand = tokens[1]
+    lead = _LEAD_TOKENS_RE.match(t)
+    if lead and lead.group(1) in WAKE_GREETINGS:
+        cand = lead.group(2)
         # Similarity against "cactus"
-        sim = difflib.SequenceMatcher(None, cand, "cactus").ratio()
+        sim = _cactus_similarity(cand)
         # Also allow cases like "hey, practice" where practice ~ cactus (often ~0.57-0.66)
         if sim >= 0.58:
             return True
@@ -211,7 +290,7 @@ def strip_wake_word_prefix(text: str) -> str:
         if low.startswith(w):
             return t[len(w):].lstrip(" ,.:;!-")
         # allow "hey cactus," with minor leading filler
-        m = re.match(rf"^\s*(?:hey|hi|hello)\s+cactus\b[ ,.:;!-]*", low, re.IGNORECASE)
+        m = _WAKE_PREFIX_RE.match(low)
         if m:
             return t[m.end():].lstrip(" ,.:;!-")
     return t
@@ -224,12 +303,23 @@ def looks_like_whatsapp_command(text: str) -> bool:
 # -----------------------------
 # Intent extraction
 # -----------------------------
+# Parsed intents by exact command text (whitespace-normalized, case kept). Only
+# exact repeats hit: a near-identical phrasing can still name another recipient
+# or carry a different message.
+_INTENT_CACHE = {}
+_INTENT_CACHE_MAX = 256
+
+
 def extract_with_hybrid_llm(text: str) -> dict | None:
     """
     Use your existing generate_hybrid() to extract recipient+message as a tool call.
+    A repeated command (e.g. after a failed send) reuses the earlier parse.
 
     Returns: {"recipient": ..., "message": ...} or None
     """
+    key = " ".join(text.split())
+    if key in _INTENT_CACHE:
+        return dict(_INTENT_CACHE[key], parse_source="cache")
     messages = [
         {"role": "system", "content": SYSTEM_PROMPT},
         {"role": "user", "content": text},
@@ -242,145 +332,26 @@ def extract_with_hybrid_llm(text: str) -> dict | None:
             r = (args.get("recipient") or "").strip()
             m = (args.get("message") or "").strip()
             if r and m:
+                if len(_INTENT_CACHE) >= _INTENT_CACHE_MAX:
+                    _INTENT_CACHE.clear()
+                _INTENT_CACHE[key] = {"recipient": r, "message": m}
                 return {"recipient": r, "message": m, "parse_source": result.get("source", "unknown")}
     return None
 
 
-def fallback_extract(text: str) -> dict | None:
-    """
-    Heuristic fallback if the model doesn't return a tool call.
-    Tries patterns like:
-      - "message Alice on whatsapp saying hello"
-      - "send a whatsapp to Bob: I'm late"
-    """
-    t = text.strip()
-
-    # Common "to <name> ... say/saying <msg>" pattern
-    m = re.search(r"\b(?:message|text|send)\b\s+(?:a\s+)?(?:whatsapp\s+)?(?:to\s+)?([A-Z][\w\- ]{1,40}?)\s+(?:on\s+)?(?:whatsapp|what'?s\s*app)\b.*?\b(?:say|saying|that)\b\s+(.+)$", t, re.IGNORECASE)
-    if m:
-        return {"recipient": m.group(1).strip(), "message": m.group(2).strip(), "parse_source": "regex"}
-
-    # "whatsapp <name>: <msg>"
-    m = re.search(r"\b(?:whatsapp|what'?s\s*app)\b\s+([A-Z][\w\- ]{1,40}?)\s*[:\-]\s*(.+)$", t, re.IGNORECASE)
-    if m:
-        return {"recipient": m.group(1).strip(), "message": m.group(2).strip(), "parse_source": "regex"}
-
-    return None
-
-
 # -----------------------------
 # WhatsApp Web automation
 # -----------------------------
-def _try_fill(page, selectors, text, press_enter=False, timeout_ms=8000):
-    last_err = None
-    for sel in selectors:
-        try:
-            page.wait_for_selector(sel, timeout=timeout_ms)
-            page.click(sel)
-            page.fill(sel, text)
-            if press_enter:
-                page.keyboard.press("Enter")
-            return True
-        except Exception as e:
-            last_err = e
-    if last_err:
-        raise last_err
-    return False
-
-
-def ensure_whatsapp_logged_in(page, timeout_s: int = 120):
-    """
-    If not logged in, WhatsApp shows a QR code. We give the user time to scan it.
-    We consider "logged in" when the chat search box is visible.
-    """
-    # WhatsApp Web UI changes, so we try multiple selectors for the left search box.
-    search_selectors = [
-        'div[contenteditable="true"][data-tab="3"]',
-        'div[contenteditable="true"][data-tab="2"]',
-        'div[role="textbox"][contenteditable="true"]',
-    ]
-
-    deadline = time.time() + timeout_s
-    while time.time() < deadline:
-        for sel in search_selectors:
-            try:
-                if page.query_selector(sel):
-                    return
-            except Exception:
-                pass
-        time.sleep(1)
-
-    raise RuntimeError("Timed out waiting for WhatsApp Web login (scan the QR code).")
-
-
-def whatsapp_send_via_web(recipient: str, message: str):
+def prepare_for_send():
     """
-    Send a message via WhatsApp Web using a persistent Playwright profile.
+    Get WhatsApp Web ready for a send whose recipient is not known yet: reopen the
+    page if it was closed, then focus and clear the search box. Errors are ignored;
+    the send itself retries and reports them.
     """
-    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch_persistent_context(
-            user_data_dir=str(PROFILE_DIR),
-            headless=False,
-        )
-        page = browser.pages[0] if browser.pages else browser.new_page()
-        page.goto(WHATSAPP_WEB_URL, wait_until="domcontentloaded")
-
-        ensure_whatsapp_logged_in(page)
-
-        # 1) Search for recipient
-        # Try a few candidate selectors for the search field.
-        search_selectors = [
-            'div[contenteditable="true"][data-tab="3"]',
-            'div[contenteditable="true"][data-tab="2"]',
-            'div[role="textbox"][contenteditable="true"]',
-        ]
-
-        # Clear any prior text (Ctrl/Cmd+A then Backspace)
-        page.keyboard.press("Control+A")
-        page.keyboard.press("Backspace")
-
-        _try_fill(page, search_selectors, recipient, press_enter=False)
-
-        # Wait briefly for results to populate
-        time.sleep(1.0)
-
-        # 2) Click the first matching chat in the results list
-        # WhatsApp Web often uses span[title="Name"] in the results.
-        candidate_chat_selectors = [
-            f'span[title="{recipient}"]',
-            f'text="{recipient}"',
-        ]
-        clicked = False
-        for sel in candidate_chat_selectors:
-            try:
-                el = page.query_selector(sel)
-                if el:
-                    el.click()
-                    clicked = True
-                    break
-            except Exception:
-                pass
-        if not clicked:
-            # As a fallback, press Enter to open the top result.
-            page.keyboard.press("Enter")
-
-        # 3) Type message in composer and send
-        composer_selectors = [
-            'div[contenteditable="true"][data-tab="10"]',
-            'div[contenteditable="true"][data-tab="9"]',
-            'footer div[contenteditable="true"][role="textbox"]',
-            'div[role="textbox"][contenteditable="true"]',
-        ]
-
-        _try_fill(page, composer_selectors, message, press_enter=False)
-        page.keyboard.press("Enter")
-
-        # Give a moment for send to complete
-        time.sleep(1.0)
-
-        browser.close()
+    try:
+        fill_first(ensure_page(), SEARCH_SELECTORS, "")
+    except Exception:
+        pass
 
 
 # -----------------------------
@@ -388,22 +359,54 @@ def whatsapp_send_via_web(recipient: str, message: str):
 # -----------------------------
 def main():
     print("\n🎙️  Voice-to-WhatsApp demo started.")
-    print("Listening continuously in short chunks (wake-word required).")
-    print(f"Chunk length: {CHUNK_SECONDS}s | Sample rate: {AUDIO_SR}Hz")
+    print("Listening continuously; each utterance is transcribed on its own (wake-word required).")
+    print(f"Max utterance: {CHUNK_SECONDS}s | End-of-utterance silence: {VAD_SILENCE_SEC}s | Sample rate: {AUDIO_SR}Hz")
     print("Say something like: 'Hey Cactus, send a WhatsApp message to Alice saying I'm running late.'")
     print("Stop with Ctrl+C.\n")
 
     try:
-        whisper = cactus_init(validate_whisper_weights(WHISPER_WEIGHTS))
+        weights = validate_whisper_weights(WHISPER_WEIGHTS)
     except Exception as e:
         print(f"\n❌ {e}\n")
         return
 
+    # Load Whisper on a worker thread while WhatsApp Web opens and logs in here, so the
+    # first send skips the browser cold start. Playwright's sync API is bound to the
+    # thread that started it, and every send runs on this one.
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        whisper_future = ex.submit(cactus_init, weights)
+        try:
+            ensure_page()
+        except Exception as e:
+            print(f"⚠️  WhatsApp Web not ready ({e}); retrying on the first send.")
+        try:
+            whisper = whisper_future.result()
+        except Exception as e:
+            close_browser()
+            print(f"\n❌ {e}\n")
+            return
+
     armed_until = 0.0  # epoch seconds until which commands are accepted
 
+    # Capture runs on its own thread so the mic never idles while Whisper,
+    # the intent model or WhatsApp Web are busy with the previous chunk.
+    audio_q = queue.Queue(maxsize=AUDIO_QUEUE_CHUNKS)
+    stop = threading.Event()
+    capture = threading.Thread(
+        target=capture_chunks, args=(audio_q, stop, CHUNK_SECONDS, AUDIO_SR), daemon=True
+    )
+    capture.start()
+
+    # The model parses on this worker while the main thread primes WhatsApp Web
+    # (Playwright's sync API is bound to the thread that started it).
+    intent_pool = ThreadPoolExecutor(max_workers=1)
+
     try:
         while True:
-            wav_path = record_chunk(CHUNK_SECONDS, AUDIO_SR)
+            audio = audio_q.get()
+            if isinstance(audio, Exception):
+                raise audio
+            wav_path = write_chunk(audio, AUDIO_SR)
             try:
                 text = transcribe_chunk(whisper, wav_path)
             finally:
@@ -434,7 +437,19 @@ def main():
             if not looks_like_whatsapp_command(cleaned):
                 continue
 
-            parsed = extract_with_hybrid_llm(cleaned) or fallback_extract(cleaned)
+            # Only the canonical "send a WhatsApp to <Name> saying ..." shape skips the
+            # model; the looser regex shapes are a fallback for when it finds no call.
+            parsed = parse_send_command(cleaned)
+            if parsed:
+                parsed["parse_source"] = "regex"
+            else:
+                pending_intent = intent_pool.submit(extract_with_hybrid_llm, cleaned)
+                prepare_for_send()
+                parsed = pending_intent.result()
+                if not parsed:
+                    parsed = parse_fallback_command(cleaned)
+                    if parsed:
+                        parsed["parse_source"] = "regex"
             if not parsed:
                 print("Could not extract recipient/message yet. Try rephrasing.")
                 continue
@@ -444,7 +459,7 @@ def main():
             print(f"→ Sending WhatsApp to '{recipient}': {message}  (parsed via {parsed.get('parse_source')})")
 
             try:
-                whatsapp_send_via_web(recipient, message)
+                send_message(recipient, message)
                 print("✅ Sent.\n")
             except Exception as e:
                 print(f"❌ Failed to send via WhatsApp Web: {e}\n")
@@ -452,6 +467,10 @@ def main():
     except KeyboardInterrupt:
         print("\nStopping.")
     finally:
+        stop.set()
+        capture.join(timeout=CHUNK_SECONDS + 1)
+        intent_pool.shutdown(wait=False, cancel_futures=True)
+        close_browser()
         cactus_destroy(whisper)
 
 
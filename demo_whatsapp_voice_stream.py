@@ -8,9 +8,12 @@ Key difference vs chunked version:
 - Every STEP_SECONDS, it snapshots the most recent WINDOW_SECONDS of audio and submits
   a transcription job in a background thread. While transcribing, the mic keeps streaming.
 - Wake word gating remains: you must say "Hey Cactus" (fuzzy) before WhatsApp commands run.
+- A command is parsed in the background as soon as one window hears it, while the next
+  window is transcribed, and sent once the next window's transcript agrees with it.
+- WhatsApp Web is opened once at startup on its own thread; sends are queued to it.
 
 Install:
-  pip install sounddevice soundfile playwright numpy
+  pip install sounddevice playwright numpy
   python -m playwright install
   (macOS) brew install portaudio   # if sounddevice needs it
 
@@ -20,47 +23,73 @@ Run:
 Env knobs:
   WHISPER_WEIGHTS=weights/whisper-small
   AUDIO_SR=16000
+  AUDIO_TMP_DIR=/dev/shm
   WINDOW_SECONDS=6
   STEP_SECONDS=1.5
+  VAD_SPEECH_THRESH=0.015
+  VAD_MIN_SPEECH_SEC=0.3
   WAKE_WORDS="hey cactus,hi cactus"
   ARMED_SECONDS=12
 """
 
 import os
 import re
+import atexit
 import time
 import json
+import inspect
+import queue
 import tempfile
 import threading
 from pathlib import Path
-from collections import deque
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
 import difflib
 
 import numpy as np
 import sounddevice as sd
-import soundfile as sf
 
 import sys
 sys.path.insert(0, "cactus/python/src")
 os.environ.setdefault("CACTUS_NO_CLOUD_TELE", "1")  # reduce telemetry noise
 
 from cactus import cactus_init, cactus_transcribe, cactus_destroy
+from audio_io import to_pcm16, write_wav
 from main import generate_hybrid
+from whatsapp_intent import parse_send_command, parse_fallback_command
 
-from playwright.sync_api import sync_playwright
+from whatsapp_web import close_browser, ensure_page, send_message
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # orjson is optional; stdlib json parses the same transcripts
+    _json_loads = json.loads
+
+try:
+    from rapidfuzz.fuzz import ratio as _fuzz_ratio
+except ImportError:  # rapidfuzz is optional; difflib gives (nearly) the same 0-100 score
+    def _fuzz_ratio(a, b):
+        return difflib.SequenceMatcher(None, a, b).ratio() * 100.0
 
 
 # -----------------------------
 # Config
 # -----------------------------
 WHISPER_WEIGHTS = os.environ.get("WHISPER_WEIGHTS", "weights/whisper-small")
-AUDIO_SR = int(os.environ.get("AUDIO_SR", "16000"))
+AUDIO_SR = int(os.environ.get("AUDIO_SR", "16000"))  # mic rate; the ring is kept at WHISPER_SR
+WHISPER_SR = 16000
+# Window WAVs (older bindings only) go to tmpfs when there is one, so they stay in RAM
+AUDIO_TMP_DIR = os.environ.get("AUDIO_TMP_DIR") or ("/dev/shm" if os.path.isdir("/dev/shm") else None)
 
 # Streaming windowing:
 WINDOW_SECONDS = float(os.environ.get("WINDOW_SECONDS", "6"))
 STEP_SECONDS = float(os.environ.get("STEP_SECONDS", "1.5"))
 
+# Energy VAD: windows with less voiced audio than this are not sent to Whisper.
+VAD_FRAME_MS = 30
+VAD_SPEECH_THRESH = float(os.environ.get("VAD_SPEECH_THRESH", "0.015"))  # RMS threshold for "speech"
+VAD_MIN_SPEECH_SEC = float(os.environ.get("VAD_MIN_SPEECH_SEC", "0.3"))
+
 # WhatsApp command gating
 COMMAND_TRIGGERS = (
     "whatsapp",
@@ -74,9 +103,8 @@ WAKE_WORDS = tuple(
     if w.strip()
 )
 ARMED_SECONDS = float(os.environ.get("ARMED_SECONDS", "12"))
-
-PROFILE_DIR = Path(os.environ.get("WHATSAPP_PROFILE_DIR", ".whatsapp_profile")).resolve()
-WHATSAPP_WEB_URL = "https://web.whatsapp.com/"
+# Fuzzy wake word: "<greeting> <token like cactus>"
+WAKE_GREETINGS = frozenset({"hey", "hi", "hello", "okay", "ok"})
 
 
 TOOL_WHATSAPP_SEND = {
@@ -123,6 +151,19 @@ def validate_whisper_weights(path_str: str) -> str:
 # -----------------------------
 # Helpers
 # -----------------------------
+# Compiled once: these run on every STEP_SECONDS tick.
+# The first two word tokens; only "<greeting> <cactus-like word>" is fuzzy-checked,
+# so the rest of the transcript is never tokenized.
+_LEAD_TOKENS_RE = re.compile(r"[^a-z']*([a-z']+)[^a-z']+([a-z']+)")
+_WAKE_PREFIX_RE = re.compile(r"^\s*(?:hey|hi|hello|ok|okay)\s+cactus\b[ ,.:;!-]*", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def _cactus_similarity(cand: str) -> float:
+    """0-1 similarity of a transcribed token to "cactus" (Whisper repeats its mishearings)."""
+    return _fuzz_ratio(cand, "cactus") / 100.0
+
+
 def is_non_speech(text: str) -> bool:
     t = text.strip()
     return (t.startswith("(") and t.endswith(")")) or t in {"", "[BLANK_AUDIO]"}
@@ -134,10 +175,10 @@ def detect_wake_word(text: str) -> bool:
         return False
     if any(w in t for w in WAKE_WORDS):
         return True
-    tokens = re.findall(r"[a-z']+", t)
-    if len(tokens) >= 2 and tokens[0] in {"hey", "hi", "hello", "okay", "ok"}:
-        cand = tokens[1]
-        sim = difflib.SequenceMatcher(None, cand, "cactus").ratio()
+    lead = _LEAD_TOKENS_RE.match(t)
+    if lead and lead.group(1) in WAKE_GREETINGS:
+        cand = lead.group(2)
+        sim = _cactus_similarity(cand)
         if sim >= 0.58:
             return True
     return False
@@ -149,7 +190,7 @@ def strip_wake_word_prefix(text: str) -> str:
     for w in WAKE_WORDS:
         if low.startswith(w):
             return t[len(w):].lstrip(" ,.:;!-")
-    m = re.match(r"^\s*(?:hey|hi|hello|ok|okay)\s+cactus\b[ ,.:;!-]*", low, re.IGNORECASE)
+    m = _WAKE_PREFIX_RE.match(low)
     if m:
         return t[m.end():].lstrip(" ,.:;!-")
     return t
@@ -163,32 +204,81 @@ def looks_like_whatsapp_command(text: str) -> bool:
 # -----------------------------
 # Transcription
 # -----------------------------
+# Cactus bindings that accept raw 16 kHz PCM16 bytes (pcm_data=) let the window go to
+# Whisper from memory; older ones only read files, so the temp WAV stays as fallback.
+try:
+    TRANSCRIBE_TAKES_PCM = "pcm_data" in inspect.signature(cactus_transcribe).parameters
+except (TypeError, ValueError):  # no introspectable signature
+    TRANSCRIBE_TAKES_PCM = False
+
+
+def has_speech(audio: np.ndarray, sr: int) -> bool:
+    """True if at least VAD_MIN_SPEECH_SEC of 30 ms frames are above the RMS threshold."""
+    frame_len = int(sr * VAD_FRAME_MS / 1000)
+    n = audio.shape[0] // frame_len
+    if n == 0:
+        return False
+    frames = audio[: n * frame_len].reshape(n, frame_len)
+    energy = np.einsum("ij,ij->i", frames, frames) / frame_len  # mean square per frame
+    voiced = np.count_nonzero(energy >= VAD_SPEECH_THRESH * VAD_SPEECH_THRESH)
+    return voiced * VAD_FRAME_MS >= VAD_MIN_SPEECH_SEC * 1000
+
+
+# Bindings without pcm_data get each window through one temp WAV that is rewritten in
+# place, instead of a mkstemp + unlink per tick.
+_tmp_wav_path = None
+_tmp_wav_lock = threading.Lock()
+
+
+def _remove_tmp_wav():
+    try:
+        os.remove(_tmp_wav_path)
+    except (OSError, TypeError):
+        pass
+
+
+def _reused_wav_path() -> str:
+    global _tmp_wav_path
+    if _tmp_wav_path is None:
+        fd, _tmp_wav_path = tempfile.mkstemp(suffix=".wav", prefix="cactus_stream_", dir=AUDIO_TMP_DIR)
+        os.close(fd)
+        atexit.register(_remove_tmp_wav)
+    return _tmp_wav_path
+
+
 def transcribe_audio_array(whisper, audio: np.ndarray, sr: int) -> str:
     """
     audio: shape (n,) float32 [-1,1]
     """
-    fd, wav_path = tempfile.mkstemp(suffix=".wav", prefix="cactus_stream_")
-    os.close(fd)
+    prompt = "<|startoftranscript|><|en|><|transcribe|><|notimestamps|>"
+    if TRANSCRIBE_TAKES_PCM and sr == 16000:  # raw PCM carries no rate; Whisper wants 16 kHz
+        raw = cactus_transcribe(whisper, None, prompt=prompt, pcm_data=to_pcm16(audio).tobytes())
+    else:
+        with _tmp_wav_lock:  # one shared file (the executor has a single worker anyway)
+            wav_path = _reused_wav_path()
+            write_wav(os.open(wav_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), audio, sr)
+            raw = cactus_transcribe(whisper, wav_path, prompt=prompt)
     try:
-        sf.write(wav_path, audio, sr)
-        prompt = "<|startoftranscript|><|en|><|transcribe|><|notimestamps|>"
-        raw = cactus_transcribe(whisper, wav_path, prompt=prompt)
-        try:
-            data = json.loads(raw)
-            return (data.get("response") or "").strip()
-        except json.JSONDecodeError:
-            return ""
-    finally:
-        try:
-            os.remove(wav_path)
-        except OSError:
-            pass
+        data = _json_loads(raw)
+        return (data.get("response") or "").strip()
+    except json.JSONDecodeError:  # orjson.JSONDecodeError subclasses it
+        return ""
 
 
 # -----------------------------
 # Intent extraction
 # -----------------------------
+# Parsed intents by exact command text (whitespace-normalized, case kept). Only
+# exact repeats hit: a near-identical phrasing can still name another recipient
+# or carry a different message.
+_INTENT_CACHE = {}
+_INTENT_CACHE_MAX = 256
+
+
 def extract_with_hybrid_llm(text: str) -> dict | None:
+    key = " ".join(text.split())
+    if key in _INTENT_CACHE:
+        return dict(_INTENT_CACHE[key])
     messages = [
         {"role": "system", "content": SYSTEM_PROMPT},
         {"role": "user", "content": text},
@@ -201,147 +291,147 @@ def extract_with_hybrid_llm(text: str) -> dict | None:
             r = (args.get("recipient") or "").strip()
             m = (args.get("message") or "").strip()
             if r and m:
+                if len(_INTENT_CACHE) >= _INTENT_CACHE_MAX:
+                    _INTENT_CACHE.clear()
+                _INTENT_CACHE[key] = {"recipient": r, "message": m}
                 return {"recipient": r, "message": m}
     return None
 
 
-def fallback_extract(text: str) -> dict | None:
-    t = text.strip()
-    m = re.search(
-        r"\b(?:message|text|send)\b\s+(?:a\s+)?(?:whatsapp\s+)?(?:to\s+)?([A-Z][\w\- ]{1,40}?)\s+"
-        r"(?:on\s+)?(?:whatsapp|what'?s\s*app)\b.*?\b(?:say|saying|that)\b\s+(.+)$",
-        t,
-        re.IGNORECASE,
-    )
-    if m:
-        return {"recipient": m.group(1).strip(), "message": m.group(2).strip()}
-    m = re.search(r"\b(?:whatsapp|what'?s\s*app)\b\s+([A-Z][\w\- ]{1,40}?)\s*[:\-]\s*(.+)$", t, re.IGNORECASE)
-    if m:
-        return {"recipient": m.group(1).strip(), "message": m.group(2).strip()}
-    return None
+def parse_command(text: str) -> dict | None:
+    # Only the canonical shape skips the model; the looser regex shapes are a fallback.
+    return parse_send_command(text) or extract_with_hybrid_llm(text) or parse_fallback_command(text)
+
+
+def command_key(text: str) -> str:
+    """Normalized command text used to check that consecutive windows agree."""
+    return " ".join(text.lower().split()).rstrip(" .!?")
+
+
+def same_command(a: str | None, b: str) -> bool:
+    """
+    Two windows heard the same command if their keys agree on the tail: the window
+    slides, so one may have lost or gained leading words, but a command that is still
+    being spoken grows at the end.
+    """
+    return a is not None and (a.endswith(b) or b.endswith(a))
 
 
 # -----------------------------
 # WhatsApp Web automation
 # -----------------------------
-def ensure_whatsapp_logged_in(page, timeout_s: int = 120):
-    search_selectors = [
-        'div[contenteditable="true"][data-tab="3"]',
-        'div[contenteditable="true"][data-tab="2"]',
-        'div[role="textbox"][contenteditable="true"]',
-    ]
-    deadline = time.time() + timeout_s
-    while time.time() < deadline:
-        for sel in search_selectors:
-            try:
-                if page.query_selector(sel):
-                    return
-            except Exception:
-                pass
-        time.sleep(1)
-    raise RuntimeError("Timed out waiting for WhatsApp Web login (scan the QR code).")
-
-
 def whatsapp_send_via_web(recipient: str, message: str):
-    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
-    with sync_playwright() as p:
-        browser = p.chromium.launch_persistent_context(user_data_dir=str(PROFILE_DIR), headless=False)
-        page = browser.pages[0] if browser.pages else browser.new_page()
-        page.goto(WHATSAPP_WEB_URL, wait_until="domcontentloaded")
-        ensure_whatsapp_logged_in(page)
-
-        # Search box
-        search_selectors = [
-            'div[contenteditable="true"][data-tab="3"]',
-            'div[contenteditable="true"][data-tab="2"]',
-            'div[role="textbox"][contenteditable="true"]',
-        ]
-        # Focus search and clear
-        page.keyboard.press("Control+A")
-        page.keyboard.press("Backspace")
-        for sel in search_selectors:
-            try:
-                page.wait_for_selector(sel, timeout=8000)
-                page.click(sel)
-                page.fill(sel, recipient)
-                break
-            except Exception:
-                continue
+    # Non-strict: a missing search box or composer falls through to the keyboard
+    # (Enter opens the top result / sends) instead of failing the send.
+    send_message(recipient, message, strict=False)
 
-        time.sleep(1.0)
 
-        # Click match or open top result
-        clicked = False
-        for sel in [f'span[title="{recipient}"]', f'text="{recipient}"']:
-            try:
-                el = page.query_selector(sel)
-                if el:
-                    el.click()
-                    clicked = True
-                    break
-            except Exception:
-                pass
-        if not clicked:
-            page.keyboard.press("Enter")
-
-        # Composer
-        composer_selectors = [
-            'div[contenteditable="true"][data-tab="10"]',
-            'div[contenteditable="true"][data-tab="9"]',
-            'footer div[contenteditable="true"][role="textbox"]',
-            'div[role="textbox"][contenteditable="true"]',
-        ]
-        for sel in composer_selectors:
-            try:
-                page.wait_for_selector(sel, timeout=8000)
-                page.click(sel)
-                page.fill(sel, message)
-                break
-            except Exception:
-                continue
-        page.keyboard.press("Enter")
-        time.sleep(1.0)
-        browser.close()
+def whatsapp_sender(jobs: queue.Queue):
+    """
+    Sender thread: opens WhatsApp Web once, then sends each queued (recipient, message)
+    so the listening loop never waits on the browser. A None job closes the browser.
+    """
+    try:
+        ensure_page()
+    except Exception as e:
+        print(f"❌ Could not open WhatsApp Web: {e}\n")
+    while True:
+        job = jobs.get()
+        if job is None:
+            close_browser()
+            return
+        recipient, message = job
+        try:
+            whatsapp_send_via_web(recipient, message)
+            print("✅ Sent.\n")
+        except Exception as e:
+            print(f"❌ Failed to send via WhatsApp Web: {e}\n")
 
 
 # -----------------------------
 # Streaming capture
 # -----------------------------
 class AudioRingBuffer:
+    """
+    The most recent max_seconds of mono audio in one preallocated circular buffer.
+    push() copies straight into place and snapshot_last() copies out only the window
+    asked for, so neither allocates per block nor joins a list of chunks.
+    """
+
     def __init__(self, max_seconds: float, sr: int):
         self.sr = sr
         self.max_frames = int(max_seconds * sr)
-        self.buf = deque()  # chunks of np.ndarray (n, )
-        self.n_frames = 0
+        self.buf = np.zeros((self.max_frames,), dtype=np.float32)
+        self.out = np.empty((self.max_frames,), dtype=np.float32)  # reused by snapshot_last
+        self.pos = 0  # next write index
+        self.n_frames = 0  # valid samples, up to max_frames
         self.lock = threading.Lock()
 
     def push(self, frames: np.ndarray):
-        # frames: (n, 1) float32
-        mono = frames.reshape(-1).astype(np.float32, copy=False)
+        # frames: (n, 1) float32; copied here, so the caller may pass a reused buffer
+        mono = frames.reshape(-1)[-self.max_frames:]
+        n = mono.shape[0]
         with self.lock:
-            self.buf.append(mono)
-            self.n_frames += mono.shape[0]
-            # trim oldest
-            while self.n_frames > self.max_frames and self.buf:
-                old = self.buf.popleft()
-                self.n_frames -= old.shape[0]
+            end = self.pos + n
+            if end <= self.max_frames:
+                self.buf[self.pos:end] = mono
+            else:
+                split = self.max_frames - self.pos
+                self.buf[self.pos:] = mono[:split]
+                self.buf[:end - self.max_frames] = mono[split:]
+            self.pos = end % self.max_frames
+            self.n_frames = min(self.n_frames + n, self.max_frames)
 
     def snapshot_last(self, seconds: float) -> np.ndarray:
-        need = int(seconds * self.sr)
+        """
+        The last `seconds` of audio (or all there is). The result is a view of one
+        output buffer that the next call overwrites; main() only snapshots once the
+        previous window's transcription has finished with it.
+        """
         with self.lock:
-            if self.n_frames == 0:
-                return np.zeros((0,), dtype=np.float32)
-            parts = list(self.buf)
-        data = np.concatenate(parts) if parts else np.zeros((0,), dtype=np.float32)
-        if data.shape[0] <= need:
-            return data
-        return data[-need:]
+            need = min(int(seconds * self.sr), self.n_frames)
+            out = self.out[:need]
+            start = self.pos - need
+            if start >= 0:
+                out[:] = self.buf[start:self.pos]
+            else:  # window wraps around the end of the buffer
+                out[:-start] = self.buf[start:]
+                out[-start:] = self.buf[:self.pos]
+        return out
+
+
+class StreamResampler:
+    """
+    Converts mic blocks from src_sr to dst_sr as they arrive, so the ring, VAD and
+    Whisper all see 16 kHz and no window is resampled per tick. A boxcar low-pass one
+    output period wide, then linear interpolation; the last few input samples and the
+    fractional read position carry over so block boundaries are seamless.
+    """
+
+    def __init__(self, src_sr: int, dst_sr: int):
+        self.step = src_sr / dst_sr  # input samples per output sample
+        self.width = max(int(round(self.step)), 1)
+        self.hist = np.zeros((self.width + 1,), dtype=np.float32)
+        self.pos = float(self.hist.shape[0])  # next output, indexed into hist + block
+
+    def process(self, frames: np.ndarray) -> np.ndarray:
+        x = np.concatenate((self.hist, frames.reshape(-1)))
+        c = np.concatenate(([0.0], np.cumsum(x, dtype=np.float64)))
+        w = self.width
+        smooth = (c[w:] - c[:-w]) / w  # trailing mean of w inputs, ending at x[w - 1], x[w], ...
+        last = x.shape[0] - 1
+        out_pos = np.arange(self.pos, last + 1e-9, self.step)
+        out = np.interp(out_pos, np.arange(w - 1, last + 1), smooth).astype(np.float32)
+        h = self.hist.shape[0]
+        self.hist = x[-h:].copy()
+        self.pos = (out_pos[-1] + self.step if out_pos.size else self.pos) - (x.shape[0] - h)
+        return out
 
 
 def main():
     print("\n🎙️  Always-listening Voice-to-WhatsApp demo started.")
     print("Mic stream stays on continuously while code runs (transcription happens in background).")
-    print(f"Window: {WINDOW_SECONDS}s | Step: {STEP_SECONDS}s | Sample rate: {AUDIO_SR}Hz")
+    print(f"Window: {WINDOW_SECONDS}s | Step: {STEP_SECONDS}s | Mic rate: {AUDIO_SR}Hz")
     print("Say: 'Hey Cactus, send a WhatsApp message to Alice saying I'm running late.'")
     print("Stop with Ctrl+C.\n")
 
@@ -351,7 +441,8 @@ def main():
         print(f"\n❌ {e}\n")
         return
 
-    ring = AudioRingBuffer(max_seconds=max(WINDOW_SECONDS, 20), sr=AUDIO_SR)
+    ring = AudioRingBuffer(max_seconds=max(WINDOW_SECONDS, 20), sr=WHISPER_SR)
+    resampler = StreamResampler(AUDIO_SR, WHISPER_SR) if AUDIO_SR != WHISPER_SR else None
 
     # Wake-word armed state
     armed_until = 0.0
@@ -360,51 +451,59 @@ def main():
     executor = ThreadPoolExecutor(max_workers=1)
     pending = None
 
+    # Speculative parsing (local agreement over consecutive windows): a command heard
+    # in one window is parsed on its own worker while the next window is transcribed,
+    # and only sent once the next transcript agrees (see same_command).
+    intent_executor = ThreadPoolExecutor(max_workers=1)
+    spec_key, spec_future = None, None
+    sent_key = None  # last command sent; its tails in later windows are not re-sent
+
+    # Browser work runs on its own thread; the loop only queues sends.
+    send_jobs = queue.Queue()
+    sender = threading.Thread(target=whatsapp_sender, args=(send_jobs,), daemon=True)
+    sender.start()
+
     # Track last time we triggered a snapshot
-    next_tick = time.time()
+    next_tick = time.monotonic()
 
     def callback(indata, frames, time_info, status):
         # indata: (frames, channels)
         if status:
             # Drop status noise to console
             pass
-        ring.push(indata.copy())
+        ring.push(resampler.process(indata) if resampler is not None else indata)
 
     try:
         with sd.InputStream(samplerate=AUDIO_SR, channels=1, dtype="float32", callback=callback):
             while True:
-                now = time.time()
-                if now < next_tick:
-                    time.sleep(0.02)
-                    continue
-                next_tick = now + STEP_SECONDS
-
-                # If a transcription job is still running, skip this tick to avoid backlog
+                # Sleep until the tick instead of polling; a transcription still running
+                # then is collected as soon as it finishes rather than a whole step later.
+                delay = next_tick - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
                 if pending is not None and not pending.done():
-                    continue
-
+                    wait([pending], timeout=STEP_SECONDS)
+                    if not pending.done():
+                        continue
+                next_tick = time.monotonic() + STEP_SECONDS
+
+                # Collect the finished window's transcript, then start the next window
+                # so it transcribes while this one is handled.
+                text = pending.result() if pending is not None else ""
+                pending = None
                 audio = ring.snapshot_last(WINDOW_SECONDS)
-                if audio.shape[0] < int(0.5 * AUDIO_SR):
-                    continue  # not enough audio yet
-
-                # Submit transcription
-                pending = executor.submit(transcribe_audio_array, whisper, audio, AUDIO_SR)
-
-                # If completed quickly, handle immediately; else we will handle on next tick
-                if pending.done():
-                    text = pending.result()
-                else:
-                    # Handle results next loop iteration (non-blocking)
-                    continue
+                # Skip Whisper for short or silent windows
+                if audio.shape[0] >= int(0.5 * WHISPER_SR) and has_speech(audio, WHISPER_SR):
+                    pending = executor.submit(transcribe_audio_array, whisper, audio, WHISPER_SR)
 
                 if not text or is_non_speech(text):
                     continue
 
                 # Print only useful chunks (wake word or whatsapp)
-                if detect_wake_word(text) or "whatsapp" in text.lower():
+                heard_wake = detect_wake_word(text)
+                if heard_wake or "whatsapp" in text.lower():
                     print(f"Heard: {text}")
 
-                heard_wake = detect_wake_word(text)
                 if heard_wake:
                     armed_until = time.time() + ARMED_SECONDS
 
@@ -413,30 +512,39 @@ def main():
 
                 cleaned = strip_wake_word_prefix(text)
                 if not looks_like_whatsapp_command(cleaned):
+                    sent_key = None
+                    continue
+
+                key = command_key(cleaned)
+                if same_command(sent_key, key):
+                    continue  # the command already sent, still in the window
+                if not same_command(spec_key, key):
+                    # New or still-changing command: parse it while the next window transcribes.
+                    spec_key, spec_future = key, intent_executor.submit(parse_command, cleaned)
                     continue
 
-                parsed = extract_with_hybrid_llm(cleaned) or fallback_extract(cleaned)
+                parsed = spec_future.result()
+                spec_key, spec_future = None, None
                 if not parsed:
                     print("Could not extract recipient/message yet. Try rephrasing.")
                     continue
+                sent_key = key
 
                 recipient = parsed["recipient"]
                 message = parsed["message"]
                 print(f"→ Sending WhatsApp to '{recipient}': {message}")
-
-                try:
-                    whatsapp_send_via_web(recipient, message)
-                    print("✅ Sent.\n")
-                except Exception as e:
-                    print(f"❌ Failed to send via WhatsApp Web: {e}\n")
+                send_jobs.put((recipient, message))
 
     except KeyboardInterrupt:
         print("\nStopping.")
     finally:
-        try:
-            executor.shutdown(wait=False, cancel_futures=True)
-        except Exception:
-            pass
+        for ex in (executor, intent_executor):
+            try:
+                ex.shutdown(wait=False, cancel_futures=True)
+            except Exception:
+                pass
+        send_jobs.put(None)  # closes the browser once queued sends are done
+        sender.join(timeout=10)
         cactus_destroy(whisper)
 
 
@@ -1,37 +1,283 @@
 
 import sys
 sys.path.insert(0, "cactus/python/src")
-functiongemma_path = "cactus/weights/functiongemma-270m-it"
 
-import json, os, time
-from cactus import cactus_init, cactus_complete, cactus_destroy
+import atexit, json, os, re, threading, time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from cactus import cactus_init, cactus_complete, cactus_destroy, cactus_reset
 from google import genai
 from google.genai import types
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # orjson is optional; stdlib json parses the same completions
+    _json_loads = json.loads
+
+# FUNCTIONGEMMA_WEIGHTS selects another Cactus conversion of the model, e.g. an
+# INT8 build for faster decoding; accuracy is checked by running the benchmarks.
+functiongemma_path = os.environ.get("FUNCTIONGEMMA_WEIGHTS", "cactus/weights/functiongemma-270m-it")
+
+
+_TOOLSET_CACHE = {}
+_TOOLSET_CACHE_MAX = 256  # callers that build fresh tool dicts per request would otherwise grow it forever
+
+
+def _toolset(tools):
+    """
+    Per-tool-set derived structures, memoized on the identity of the tool dicts.
+    Callers pass the same module-level TOOL_* dicts on every call; the entry keeps
+    a reference to them so their ids cannot be recycled while cached.
+    """
+    key = tuple(id(t) for t in tools)
+    entry = _TOOLSET_CACHE.get(key)
+    if entry is None:
+        if len(_TOOLSET_CACHE) >= _TOOLSET_CACHE_MAX:
+            _TOOLSET_CACHE.clear()
+        entry = _TOOLSET_CACHE[key] = {
+            "tools": tuple(tools),
+            "cactus_tools": [{"type": "function", "function": t} for t in tools],
+            "validators": {t["name"]: _compile_validator(t) for t in tools},
+        }
+    return entry
+
+
+def _compile_validator(tool):
+    """(required fields, {field: JSON type}) for a tool, read out of its schema once."""
+    schema = tool.get("parameters", {})
+    field_types = {k: spec.get("type") for k, spec in schema.get("properties", {}).items()}
+    return tuple(schema.get("required", [])), field_types
+
+
+def _alarm_args(m):
+    hour, minute = int(m["hour"]), int(m["minute"] or 0)
+    meridiem = (m["meridiem"] or "").lower().replace(".", "")
+    if meridiem == "pm" and hour < 12:
+        hour += 12
+    elif meridiem == "am" and hour == 12:
+        hour = 0
+    if hour > 23 or minute > 59:
+        return None
+    return {"hour": hour, "minute": minute}
+
+
+def _timer_args(m):
+    return {"minutes": int(m["a"] or m["b"])}
+
+
+def _capitalized(value):
+    return bool(value) and all(w[0].isupper() for w in value.split())
+
+
+def _weather_args(m):
+    location = m["location"].strip()
+    return {"location": location} if _capitalized(location) else None
+
+
+def _contacts_args(m):
+    query = m["query"].strip()
+    return {"query": query} if _capitalized(query) else None
+
+
+def _message_args(m):
+    recipient = m["recipient"].strip()
+    return {"recipient": recipient, "message": m["message"].strip()} if _capitalized(recipient) else None
+
+
+def _reminder_args(m):
+    time_str = re.sub(r"\s*([ap])\.?m\.?$", lambda x: f" {x[1].upper()}M", m["time"], flags=re.I)
+    return {"title": m["title"].strip(), "time": time_str}
+
+
+# High-precision extractors for common single-intent phrasings, compiled once.
+# A rule fires only when a tool of that name with matching parameters is offered
+# and the *whole* utterance matches, so compound requests still reach the model.
+_FAST_PATH_RULES = tuple((name, re.compile(pattern, re.IGNORECASE), build) for name, pattern, build in (
+    ("set_alarm",
+     r"(?:please\s+)?(?:set\s+an?\s+alarm\s+for|wake\s+me\s+(?:up\s+)?at)\s+"
+     r"(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<meridiem>[ap]\.?m\.?)?[.!]?",
+     _alarm_args),
+    ("set_timer",
+     r"(?:please\s+)?(?:set|start)\s+a\s+(?:timer\s+for\s+(?P<a>\d+)\s+minutes?|(?P<b>\d+)[\s-]minutes?\s+(?:timer|countdown))[.!]?",
+     _timer_args),
+    ("get_weather",
+     r"(?:what(?:'s|\s+is)\s+the\s+weather(?:\s+like)?|how(?:'s|\s+is)\s+the\s+weather|(?:check|get)\s+the\s+weather)"
+     r"\s+in\s+(?P<location>[^?.!,]+?)[?.!]?",
+     _weather_args),
+    ("search_contacts",
+     r"(?:find|look\s+up|search\s+for)\s+(?P<query>[^\s,.]+(?:\s+[^\s,.]+)?)\s+in\s+my\s+contacts[.!]?",
+     _contacts_args),
+    ("send_message",
+     r"(?:send\s+a\s+message\s+to|text|message)\s+(?P<recipient>[^\s,:]+)\s+saying\s+(?P<message>.+?)[.!]?",
+     _message_args),
+    ("create_reminder",
+     r"(?:remind\s+me|set\s+a\s+reminder)\s+(?:to|about)\s+(?:the\s+)?(?P<title>.+?)\s+at\s+"
+     r"(?P<time>\d{1,2}:\d{2}\s*[ap]\.?m\.?)[.!]?",
+     _reminder_args),
+))
+
+
+# Every rule opens with its own trigger phrase, so at most one can match a whole
+# utterance: one alternation (a named group per rule) replaces a fullmatch per rule.
+_FAST_PATH_RE = re.compile("|".join(f"(?P<{name}>{pattern.pattern})" for name, pattern, _ in _FAST_PATH_RULES), re.IGNORECASE)
+_FAST_PATH_BUILD = {name: build for name, _, build in _FAST_PATH_RULES}
+
+
+# HYBRID_FAST_PATH=0 disables the rules so every request reaches the model (strict runs).
+HYBRID_FAST_PATH = os.environ.get("HYBRID_FAST_PATH", "1") == "1"
+
+
+def _fast_path(content, tools):
+    """
+    Resolve an unambiguous single-intent request without the model.
+    Returns a one-call list, or None when no rule applies to the offered tools.
+    """
+    if not HYBRID_FAST_PATH:
+        return None
+    text = content.strip()
+    m = _FAST_PATH_RE.fullmatch(text)
+    if not m:
+        return None
+    name = m.lastgroup
+    validator = _toolset(tools)["validators"].get(name)
+    if validator is None:
+        return None
+    # Free-text slots (message, title) can swallow a second request.
+    intents = 0
+    for _rule_name, pattern, _build in _FAST_PATH_RULES:
+        intents += sum(1 for _match in pattern.finditer(text))
+    if intents > 1:
+        return None
+    args = _FAST_PATH_BUILD[name](m)
+    if args is None:
+        return None
+    required, field_types = validator
+    if not set(required) <= args.keys() <= field_types.keys():
+        return None
+    return [{"name": name, "arguments": args}]
+
+
+# Model handles are kept after use and handed to the next call instead of being
+# re-initialised, so weights stay resident. Each handle is reset before it goes back
+# to the pool: calls are unrelated requests and must not see each other's KV cache.
+# CACTUS_KEEP_MODEL=0 restores init/destroy per call.
+CACTUS_KEEP_MODEL = os.environ.get("CACTUS_KEEP_MODEL", "1") == "1"
+
+# Self-consistency samples run concurrently, each on its own pooled handle (so up to
+# N_SAMPLES - 1 handles per in-flight request). HYBRID_PARALLEL_SAMPLES=0 runs them
+# one after another on a single handle.
+HYBRID_PARALLEL_SAMPLES = os.environ.get("HYBRID_PARALLEL_SAMPLES", "1") == "1"
+
+# At most CACTUS_MAX_MODELS handles exist at once, in use or idle; callers past the
+# cap wait for a handle to come back instead of loading another copy of the model.
+# Batch runs with parallel samples need about workers * (N_SAMPLES - 1) to not queue.
+CACTUS_MAX_MODELS = max(1, int(os.environ.get("CACTUS_MAX_MODELS", "4")))
+_idle_models = []
+_live_models = 0  # idle + in use + loading
+_models_cond = threading.Condition()
+
+
+def _acquire_model():
+    global _live_models
+    with _models_cond:
+        while not _idle_models and _live_models >= CACTUS_MAX_MODELS:
+            _models_cond.wait()
+        if _idle_models:
+            return _idle_models.pop()
+        _live_models += 1
+    return _load_model()
+
+
+def _load_model():
+    """cactus_init for a handle already counted in _live_models."""
+    global _live_models
+    try:
+        return cactus_init(functiongemma_path)
+    except BaseException:
+        with _models_cond:
+            _live_models -= 1
+            _models_cond.notify()
+        raise
+
+
+def _release_model(model):
+    if not CACTUS_KEEP_MODEL:
+        _discard_model(model)
+        return
+    try:
+        cactus_reset(model)
+    except BaseException:
+        _discard_model(model)
+        raise
+    with _models_cond:
+        _idle_models.append(model)
+        _models_cond.notify()
+
+
+def _discard_model(model):
+    """Destroy a handle and free its slot under CACTUS_MAX_MODELS."""
+    global _live_models
+    try:
+        cactus_destroy(model)
+    finally:
+        with _models_cond:
+            _live_models -= 1
+            _models_cond.notify()
+
+
+def prewarm_models(n=1):
+    """
+    Load model handles into the idle pool on background threads, up to `n` (and
+    CACTUS_MAX_MODELS) in total, and return immediately. Callers that arrive before
+    loading finishes initialise their own handle while under the cap.
+    """
+    global _live_models
+    if not CACTUS_KEEP_MODEL:
+        return
+    with _models_cond:
+        missing = max(0, min(n, CACTUS_MAX_MODELS) - _live_models)
+        _live_models += missing
+
+    def _load_idle():
+        model = _load_model()
+        with _models_cond:
+            _idle_models.append(model)
+            _models_cond.notify()
+
+    for _ in range(missing):
+        threading.Thread(target=_load_idle, daemon=True).start()
+
+
+@atexit.register
+def _destroy_idle_models():
+    while _idle_models:
+        cactus_destroy(_idle_models.pop())
+
 
 def generate_cactus(messages, tools):
     """Run function calling on-device via FunctionGemma + Cactus."""
-    model = cactus_init(functiongemma_path)
-
-    cactus_tools = [{
-        "type": "function",
-        "function": t,
-    } for t in tools]
-
-    raw_str = cactus_complete(
-        model,
-        [{"role": "system", "content": "You are a helpful assistant that can use tools."}] + messages,
-        tools=cactus_tools,
-        force_tools=True,
-        max_tokens=256,
-        stop_sequences=["<|im_end|>", "<end_of_turn>"],
-    )
-
-    cactus_destroy(model)
+    model = _acquire_model()
+    try:
+        cactus_tools = _toolset(tools)["cactus_tools"]
+
+        raw_str = cactus_complete(
+            model,
+            [{"role": "system", "content": "You are a helpful assistant that can use tools."}] + messages,
+            tools=cactus_tools,
+            # Constrains decoding to tool calls over `cactus_tools`; the binding takes
+            # no separate grammar, so this is the only decoding constraint available.
+            force_tools=True,
+            max_tokens=256,
+            stop_sequences=["<|im_end|>", "<end_of_turn>"],
+        )
+    except BaseException:
+        # A failed call leaves the handle in an unknown state; don't pool it
+        _discard_model(model)
+        raise
+    _release_model(model)
 
     try:
-        raw = json.loads(raw_str)
-    except json.JSONDecodeError:
+        raw = _json_loads(raw_str)
+    except json.JSONDecodeError:  # orjson.JSONDecodeError subclasses it
         return {
             "function_calls": [],
             "total_time_ms": 0,
@@ -45,32 +291,53 @@ def generate_cactus(messages, tools):
     }
 
 
+# One Gemini client for the process, created on first use, so cloud calls reuse its
+# HTTP connection instead of setting up a new client (and TLS session) every call.
+_gemini_client = None
+_gemini_client_lock = threading.Lock()  # batch and speculative calls can race the first use
+
+
+def _get_gemini_client():
+    global _gemini_client
+    if _gemini_client is None:
+        with _gemini_client_lock:
+            if _gemini_client is None:
+                _gemini_client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+    return _gemini_client
+
+
 def generate_cloud(messages, tools):
     """Run function calling via Gemini Cloud API."""
-    client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
-
-    gemini_tools = [
-        types.Tool(function_declarations=[
-            types.FunctionDeclaration(
-                name=t["name"],
-                description=t["description"],
-                parameters=types.Schema(
-                    type="OBJECT",
-                    properties={
-                        k: types.Schema(
-                            type=v["type"].upper(),
-                            description=v.get("description", ""),
-                            **({"items": types.Schema(type=v["items"]["type"].upper())}
-                               if v.get("type") == "array" and "items" in v else {}),
-                        )
-                        for k, v in t["parameters"]["properties"].items()
-                    },
-                    required=t["parameters"].get("required", []),
-                ),
-            )
-            for t in tools
-        ])
-    ]
+    client = _get_gemini_client()
+
+    # Built locally and published with one write, so a concurrent caller sees either
+    # no config or the finished one (two racing builds produce the same value).
+    toolset = _toolset(tools)
+    gemini_config = toolset.get("gemini_config")
+    if gemini_config is None:
+        gemini_tools = [
+            types.Tool(function_declarations=[
+                types.FunctionDeclaration(
+                    name=t["name"],
+                    description=t["description"],
+                    parameters=types.Schema(
+                        type="OBJECT",
+                        properties={
+                            k: types.Schema(
+                                type=v["type"].upper(),
+                                description=v.get("description", ""),
+                                **({"items": types.Schema(type=v["items"]["type"].upper())}
+                                   if v.get("type") == "array" and "items" in v else {}),
+                            )
+                            for k, v in t["parameters"]["properties"].items()
+                        },
+                        required=t["parameters"].get("required", []),
+                    ),
+                )
+                for t in tools
+            ])
+        ]
+        gemini_config = toolset["gemini_config"] = types.GenerateContentConfig(tools=gemini_tools)
 
     contents = [m["content"] for m in messages if m["role"] == "user"]
 
@@ -79,7 +346,7 @@ def generate_cloud(messages, tools):
     gemini_response = client.models.generate_content(
         model="gemini-2.5-flash",
         contents=contents,
-        config=types.GenerateContentConfig(tools=gemini_tools),
+        config=gemini_config,
     )
 
     total_time_ms = (time.time() - start_time) * 1000
@@ -99,11 +366,54 @@ def generate_cloud(messages, tools):
     }
 
 
+# HYBRID_SPECULATIVE_CLOUD=1 starts the cloud call alongside the on-device attempt,
+# so a fallback costs max(on-device, cloud) instead of their sum. Off by default:
+# it spends a Gemini request on every query that misses the regex fast path.
+HYBRID_SPECULATIVE_CLOUD = os.environ.get("HYBRID_SPECULATIVE_CLOUD", "0") == "1"
+# Created at import (its threads start on first submit), so concurrent callers share one pool.
+_cloud_executor = ThreadPoolExecutor(max_workers=4) if HYBRID_SPECULATIVE_CLOUD else None
+
+
+def _speculate_cloud(messages, tools):
+    """Submit generate_cloud in the background; None when speculation is off."""
+    if _cloud_executor is None:
+        return None
+    return _cloud_executor.submit(generate_cloud, messages, tools)
+
+
+def _cloud_fallback(cloud_future, messages, tools, spent_time):
+    """Cloud result for a failed on-device attempt that took spent_time ms."""
+    if cloud_future is None:
+        cloud = generate_cloud(messages, tools)
+        cloud["total_time_ms"] += spent_time
+    else:
+        cloud = cloud_future.result()  # ran concurrently with the on-device attempt
+        cloud["total_time_ms"] = max(cloud["total_time_ms"], spent_time)
+    cloud["source"] = "cloud (fallback)"
+    return cloud
+
+
+# Compound-request splitting for generate_hybrid's decomposition step.
+_CLAUSE_SPLIT_RE = re.compile(r',\s+and\s+|,\s+')
+_LEADING_AND_RE = re.compile(r'(?i)^and\s+')
+_AND_SPLIT_RE = re.compile(r'\s+and\s+', re.IGNORECASE)
+# First words that start a clause of their own when splitting on a bare "and".
+_DECOMPOSE_VERBS = frozenset({
+    "set", "send", "play", "get", "find", "search", "look", "check",
+    "create", "make", "add", "call", "text", "remind", "show", "turn",
+    "open", "close", "start", "stop", "enable", "disable", "run",
+    "schedule", "book", "cancel", "delete", "update", "read", "wake",
+    "fetch", "list", "tell", "ask", "go",
+})
+
+
 def generate_hybrid(messages, tools, confidence_threshold=0.99):
     """
     Fast-path + self-consistency + recursive decomposition hybrid inference.
 
     Strategy:
+    0. Compiled-regex extraction for unambiguous single-intent phrasings,
+       gated on the offered tool's schema (no model call at all).
     1. Inject schema-derived type hints into every on-device call (no
        hardcoded domain rules — generated entirely from the tools schema).
     2. Fast path: single on-device run. If valid AND high-confidence ->
@@ -114,7 +424,6 @@ def generate_hybrid(messages, tools, confidence_threshold=0.99):
     4. Recursive decomposition of compound requests.
     5. Cloud fallback.
     """
-    import re
     from collections import Counter
 
     N_SAMPLES = 3
@@ -144,10 +453,13 @@ def generate_hybrid(messages, tools, confidence_threshold=0.99):
 
     def _augment_messages(msgs, tool_list):
         """Prepend a schema-derived type hint as an extra system message."""
-        hint = _make_schema_hints(tool_list)
-        if hint:
-            return [{"role": "system", "content": hint}] + msgs
-        return msgs
+        toolset = _toolset(tool_list)
+        if "prompt_prefix" not in toolset:
+            # Built once per tool set; every sample then only concatenates.
+            hint = _make_schema_hints(tool_list)
+            toolset["prompt_prefix"] = [{"role": "system", "content": hint}] if hint else []
+        prefix = toolset["prompt_prefix"]
+        return prefix + msgs if prefix else msgs
 
     def _coerce(value, expected_type):
         if expected_type == "integer":
@@ -176,7 +488,7 @@ def generate_hybrid(messages, tools, confidence_threshold=0.99):
             if isinstance(value, list):
                 return value
             try:
-                parsed = json.loads(value)
+                parsed = _json_loads(value)
                 return parsed if isinstance(parsed, list) else [value]
             except Exception:
                 return [value]
@@ -191,23 +503,21 @@ def generate_hybrid(messages, tools, confidence_threshold=0.99):
         """
         if not calls:
             return calls, False
-        tool_map = {t["name"]: t for t in tool_list}
+        validators = _toolset(tool_list)["validators"]
         corrected = []
         for call in calls:
             name = call.get("name")
-            if name not in tool_map:
+            if name not in validators:
                 return calls, False
-            schema = tool_map[name].get("parameters", {})
-            props = schema.get("properties", {})
-            required = schema.get("required", [])
+            required, field_types = validators[name]
             args = dict(call.get("arguments", {}))
             for field in required:
                 if field not in args:
                     return calls, False
             corrected_args = {}
             for k, v in args.items():
-                if k in props:
-                    expected = props[k]["type"]
+                if k in field_types:
+                    expected = field_types[k]
                     coerced = _coerce(v, expected)
                     # Reject only genuine coercion failures (type still wrong after attempt)
                     if expected == "integer" and not (isinstance(coerced, int) and not isinstance(coerced, bool)):
@@ -265,15 +575,23 @@ def generate_hybrid(messages, tools, confidence_threshold=0.99):
         """
         Reuse first_run, run n-1 more times with schema hints, apply
         argument-level voting. Returns (result_or_None, total_time_ms_spent).
+        The n-1 samples are independent, so they run concurrently unless
+        HYBRID_PARALLEL_SAMPLES=0; their time then counts once (the slowest).
         """
         corrected0, is_valid0 = _validate(first_run["function_calls"], tool_list)
         valid_runs = [(corrected0, first_run["confidence"])] if is_valid0 else []
         spent_time = first_run["total_time_ms"]
 
         aug_msgs = _augment_messages(msgs, tool_list)
-        for _ in range(n - 1):
-            local = generate_cactus(aug_msgs, tool_list)
-            spent_time += local["total_time_ms"]
+        if HYBRID_PARALLEL_SAMPLES and n > 2:
+            with ThreadPoolExecutor(max_workers=n - 1) as pool:
+                # map keeps sample order, so voting ties break as in the serial path
+                samples = list(pool.map(lambda _: generate_cactus(aug_msgs, tool_list), range(n - 1)))
+            spent_time += max(local["total_time_ms"] for local in samples)
+        else:
+            samples = [generate_cactus(aug_msgs, tool_list) for _ in range(n - 1)]
+            spent_time += sum(local["total_time_ms"] for local in samples)
+        for local in samples:
             corrected, is_valid = _validate(local["function_calls"], tool_list)
             if is_valid:
                 valid_runs.append((corrected, local["confidence"]))
@@ -301,22 +619,17 @@ def generate_hybrid(messages, tools, confidence_threshold=0.99):
         # Self-consistency: run N-1 more, reuse first.
         return _self_consistent_with_first(first, msgs, tool_list)
 
-    _VERBS = {
-        "set", "send", "play", "get", "find", "search", "look", "check",
-        "create", "make", "add", "call", "text", "remind", "show", "turn",
-        "open", "close", "start", "stop", "enable", "disable", "run",
-        "schedule", "book", "cancel", "delete", "update", "read", "wake",
-        "fetch", "list", "tell", "ask", "go",
-    }
-
     def _decompose(message):
-        parts = re.split(r',\s+and\s+|,\s+', message)
-        parts = [re.sub(r'(?i)^and\s+', '', p).strip() for p in parts if p.strip()]
+        # Every split needs a comma or an "and"; most single-intent requests have neither.
+        if "," not in message and "and" not in message.lower():
+            return [message]
+        parts = _CLAUSE_SPLIT_RE.split(message)
+        parts = [_LEADING_AND_RE.sub('', p).strip() for p in parts if p.strip()]
         if len(parts) == 1:
-            candidates = [p.strip() for p in re.split(r'\s+and\s+', message, flags=re.IGNORECASE)]
+            candidates = [p.strip() for p in _AND_SPLIT_RE.split(message)]
             if (len(candidates) > 1
                     and all(len(p.split()) >= 3 for p in candidates)
-                    and all(p.split()[0].lower().rstrip("'s") in _VERBS for p in candidates)):
+                    and all(p.split()[0].lower().rstrip("'s") in _DECOMPOSE_VERBS for p in candidates)):
                 parts = candidates
         parts = [p for p in parts if len(p.split()) >= 2]
         return parts if len(parts) > 1 else [message]
@@ -335,6 +648,11 @@ def generate_hybrid(messages, tools, confidence_threshold=0.99):
         2. If that fails and depth < max_depth, decompose and recurse.
         Returns (calls_list_or_None, time_ms_spent).
         """
+        start = time.perf_counter()
+        calls = _fast_path(content, tools)
+        if calls is not None:
+            return calls, (time.perf_counter() - start) * 1000
+
         msgs = non_user + [{"role": "user", "content": content}]
         result, time_spent = _on_device(msgs, tools)
         if result is not None:
@@ -355,9 +673,24 @@ def generate_hybrid(messages, tools, confidence_threshold=0.99):
 
         return None, time_spent
 
+    # Step 0: compiled-regex extraction for unambiguous single-intent requests.
+    if user_msgs:
+        start = time.perf_counter()
+        calls = _fast_path(user_msgs[-1]["content"], tools)
+        if calls is not None:
+            return {
+                "function_calls": calls,
+                "total_time_ms": (time.perf_counter() - start) * 1000,
+                "source": "on-device",
+                "fast_path": True,
+            }
+
     # Step 1 + 2: fast-path then self-consistency on the full message.
+    cloud_future = _speculate_cloud(messages, tools)
     result, spent_time = _on_device(messages, tools)
     if result is not None:
+        if cloud_future is not None:
+            cloud_future.cancel()  # best effort; a call already in flight is discarded
         result["source"] = "on-device"
         return result
 
@@ -377,22 +710,43 @@ def generate_hybrid(messages, tools, confidence_threshold=0.99):
                 all_calls.extend(calls)
 
             if success:
+                if cloud_future is not None:
+                    cloud_future.cancel()
                 return {
                     "function_calls": all_calls,
                     "total_time_ms": total_time,
                     "source": "on-device",
                 }
 
-            cloud = generate_cloud(messages, tools)
-            cloud["source"] = "cloud (fallback)"
-            cloud["total_time_ms"] += total_time
-            return cloud
+            return _cloud_fallback(cloud_future, messages, tools, total_time)
 
     # Step 4: cloud fallback.
-    cloud = generate_cloud(messages, tools)
-    cloud["source"] = "cloud (fallback)"
-    cloud["total_time_ms"] += spent_time
-    return cloud
+    return _cloud_fallback(cloud_future, messages, tools, spent_time)
+
+
+def generate_hybrid_batch(requests, batch_size=8, on_result=None):
+    """
+    Run generate_hybrid over a list of (messages, tools) pairs; results keep input order.
+    Cactus has no multi-prompt forward pass, so up to `batch_size` requests run
+    concurrently on threads (native inference and the Gemini client release the GIL).
+    `on_result(index, result)`, if given, is called on the calling thread as each
+    request finishes, so callers can report progress without waiting for the batch.
+    """
+    results = [None] * len(requests)
+    if batch_size <= 1:
+        for i, (messages, tools) in enumerate(requests):
+            results[i] = generate_hybrid(messages, tools)
+            if on_result is not None:
+                on_result(i, results[i])
+        return results
+    with ThreadPoolExecutor(max_workers=batch_size) as pool:
+        futures = {pool.submit(generate_hybrid, *req): i for i, req in enumerate(requests)}
+        for future in as_completed(futures):
+            i = futures[future]
+            results[i] = future.result()
+            if on_result is not None:
+                on_result(i, results[i])
+    return results
 
 
 def print_result(label, result):
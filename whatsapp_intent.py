@@ -0,0 +1,50 @@
+"""
+Regex parsing of spoken WhatsApp commands, shared by the voice demos.
+
+parse_send_command() accepts only the canonical "send a WhatsApp to <Name> saying
+<message>" shape and is safe to try before the model. parse_fallback_command() also
+accepts looser shapes and is only meant for when the model returns no tool call.
+"""
+
+import re
+
+# Recipient: one to four capitalized words. Matched case-sensitively although the
+# patterns are not, so lowercase filler ("a", "message to") never ends up in the name.
+_NAME = r"((?-i:[A-Z][\w'\-]*(?:\s+[A-Z][\w'\-]*){0,3}))"
+# "saying <msg>", "say that <msg>" or "that <msg>"; the "that" is not part of the message.
+_SAYING = r"(?:say(?:ing)?(?:\s+that(?=\s))?|that)\s+(.+)$"
+_WHATSAPP = r"(?:whatsapp|what'?s\s*app)"
+
+# "send a WhatsApp (message) to <Name> saying <msg>"
+_SEND_TO_RE = re.compile(
+    rf"\b(?:message|text|send)\b\s+(?:a\s+)?{_WHATSAPP}(?:\s+message)?\s+to\s+{_NAME}\s*,?\s+{_SAYING}",
+    re.IGNORECASE,
+)
+# "message (a message to) <Name> on WhatsApp saying <msg>", "send <Name> a WhatsApp saying <msg>"
+_SAYING_RE = re.compile(
+    rf"\b(?:message|text|send)\b\s+(?:a\s+)?(?:{_WHATSAPP}\s+)?(?:(?:message|text)\s+)?(?:to\s+)?"
+    rf"{_NAME}\s+(?:on\s+|a\s+)?{_WHATSAPP}\b.*?\b{_SAYING}",
+    re.IGNORECASE,
+)
+# "WhatsApp <Name>: <msg>"
+_COLON_RE = re.compile(rf"\b{_WHATSAPP}\s+{_NAME}\s*[:\-]\s*(.+)$", re.IGNORECASE)
+
+
+def _command(m: re.Match) -> dict:
+    return {"recipient": m.group(1).strip(), "message": m.group(2).strip()}
+
+
+def parse_send_command(text: str) -> dict | None:
+    """{"recipient", "message"} for the canonical send shape, else None."""
+    m = _SEND_TO_RE.search(text.strip())
+    return _command(m) if m else None
+
+
+def parse_fallback_command(text: str) -> dict | None:
+    """Like parse_send_command, but also tries the looser shapes."""
+    t = text.strip()
+    for pattern in (_SEND_TO_RE, _SAYING_RE, _COLON_RE):
+        m = pattern.search(t)
+        if m:
+            return _command(m)
+    return None
@@ -0,0 +1,172 @@
+"""
+WhatsApp Web automation shared by the voice demos.
+
+One persistent Chromium session per process: launched on the first send, closed on
+exit, so only the first message pays for browser startup and WhatsApp Web loading.
+Playwright's sync API is bound to the thread that started it, so every call into
+this module must come from that same thread.
+"""
+
+import os
+from pathlib import Path
+
+from playwright.sync_api import sync_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+PROFILE_DIR = Path(os.environ.get("WHATSAPP_PROFILE_DIR", ".whatsapp_profile")).resolve()
+WHATSAPP_WEB_URL = "https://web.whatsapp.com/"
+
+SEARCH_SELECTORS = (
+    'div[contenteditable="true"][data-tab="3"]',
+    'div[contenteditable="true"][data-tab="2"]',
+)
+COMPOSER_SELECTORS = (
+    'div[contenteditable="true"][data-tab="10"]',
+    'div[contenteditable="true"][data-tab="9"]',
+    'footer div[contenteditable="true"][role="textbox"]',
+)
+# Matches the composer but also the chat search box, so it is only a last resort.
+ANY_TEXTBOX = 'div[role="textbox"][contenteditable="true"]'
+
+
+def _quoted(text: str) -> str:
+    """`text` as a double-quoted selector string, so names with quotes stay valid."""
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def wait_for_login(page, timeout_s: int = 120):
+    """Block until the chat list is up (QR scan on first run; later runs reuse the saved session)."""
+    # One comma-joined selector races them all and returns as soon as any is attached
+    try:
+        page.wait_for_selector(", ".join(SEARCH_SELECTORS + (ANY_TEXTBOX,)), state="attached",
+                               timeout=timeout_s * 1000)
+    except PlaywrightTimeoutError:
+        raise RuntimeError("Timed out waiting for WhatsApp Web login. Scan the QR code.") from None
+
+
+def fill_first(page, selectors, text: str, fallback: str | None = ANY_TEXTBOX, timeout_ms: int = 8000) -> bool:
+    """Fill the first of `selectors` present on the page (`fallback` if none appears); False if nothing was filled."""
+    # One comma-joined wait races the selectors instead of waiting out each miss in
+    # turn; the one highest in the list is then filled.
+    try:
+        page.wait_for_selector(", ".join(selectors), state="attached", timeout=timeout_ms)
+    except PlaywrightTimeoutError:
+        selectors = [fallback] if fallback else []
+    for sel in selectors:
+        try:
+            if page.query_selector(sel):
+                page.click(sel)
+                page.fill(sel, text)
+                return True
+        except Exception:
+            continue
+    return False
+
+
+_PW_STATE = {"playwright": None, "browser": None, "page": None}
+
+
+def ensure_page():
+    """Return the open WhatsApp Web page, launching it on first use or after the window was closed."""
+    page = _PW_STATE["page"]
+    if page is not None and not page.is_closed():
+        return page
+    close_browser()
+
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    p = _PW_STATE["playwright"] = sync_playwright().start()
+    browser = _PW_STATE["browser"] = p.chromium.launch_persistent_context(
+        user_data_dir=str(PROFILE_DIR), headless=False
+    )
+    page = browser.pages[0] if browser.pages else browser.new_page()
+    page.goto(WHATSAPP_WEB_URL, wait_until="domcontentloaded")
+    wait_for_login(page)
+    _PW_STATE["page"] = page
+    return page
+
+
+def close_browser():
+    browser, p = _PW_STATE["browser"], _PW_STATE["playwright"]
+    _PW_STATE.update(playwright=None, browser=None, page=None)
+    for close in (browser and browser.close, p and p.stop):
+        if close:
+            try:
+                close()
+            except Exception:
+                pass
+
+
+# Chat-list titles of contacts already opened this session, keyed by the spoken
+# recipient, so repeat sends click the chat directly instead of searching again.
+_CHAT_TITLES = {}
+_CHAT_TITLES_MAX = 32
+
+
+def _open_known_chat(page, recipient: str) -> bool:
+    """Click a previously opened chat in the side pane; False if it is not cached or not listed."""
+    title = _CHAT_TITLES.get(recipient.lower())
+    if title is None:
+        return False
+    try:
+        # Last-message previews carry a title too; only the name (the first titled
+        # span in the row's gridcell) may match, or a preview could open another chat.
+        for el in page.query_selector_all(f'#pane-side [role="gridcell"] span[title={_quoted(title)}]'):
+            if el.evaluate('e => e.closest(\'[role="gridcell"]\').querySelector("span[title]") === e'):
+                el.click()
+                return True
+    except Exception:
+        pass
+    return False
+
+
+def _remember_chat(recipient: str, el):
+    try:
+        title = el.get_attribute("title")
+    except Exception:
+        return
+    if title:
+        if len(_CHAT_TITLES) >= _CHAT_TITLES_MAX:
+            _CHAT_TITLES.clear()
+        _CHAT_TITLES[recipient.lower()] = title
+
+
+def send_message(recipient: str, message: str, strict: bool = True):
+    """
+    Open the chat with `recipient` and send `message`.
+
+    With strict, a missing search box or composer raises RuntimeError. Otherwise the
+    send carries on with the keyboard: Enter opens the top search result and sends
+    whatever the composer holds.
+    """
+    page = ensure_page()
+
+    # Repeat recipients are opened from the chat list; others go through search
+    if not _open_known_chat(page, recipient):
+        # Clear any prior text (Ctrl/Cmd+A then Backspace)
+        page.keyboard.press("Control+A")
+        page.keyboard.press("Backspace")
+        if not fill_first(page, SEARCH_SELECTORS, recipient) and strict:
+            raise RuntimeError("Could not find the WhatsApp Web search box.")
+        # Click the contact as soon as it is listed; 1 s is the upper bound before
+        # falling back to Enter below.
+        try:
+            page.wait_for_selector(f"span[title={_quoted(recipient)}]", timeout=1000)
+        except PlaywrightError:
+            pass
+
+        clicked = False
+        for sel in (f"span[title={_quoted(recipient)}]", f"text={_quoted(recipient)}"):
+            try:
+                el = page.query_selector(sel)
+                if el:
+                    _remember_chat(recipient, el)
+                    el.click()
+                    clicked = True
+                    break
+            except Exception:
+                pass
+        if not clicked:
+            page.keyboard.press("Enter")
+
+    if not fill_first(page, COMPOSER_SELECTORS, message) and strict:
+        raise RuntimeError("Could not find the WhatsApp Web message box.")
+    page.keyboard.press("Enter")